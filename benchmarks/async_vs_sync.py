@@ -0,0 +1,67 @@
+"""
+Throughput of the same full-text query issued N-at-a-time by a thread pool
+over the sync service vs. one event loop over ``AsyncMarketService``.
+
+    uv run python -m benchmarks.async_vs_sync --concurrency 8 64 256 --requests 4000
+
+Both sides bypass the Redis result cache and get the same Postgres pool size,
+so the comparison is about how many queries one worker keeps in flight.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import print_table, run_concurrent, summarize
+from src.db.postgres_client import PostgresPool
+from src.services.async_service import AsyncMarketService
+from src.services.search_service import ProductSearchService
+
+QUERIES = ["handmade", "product", "lovely", "lovely handmade", "product 1", "wooden bowl"]
+
+
+async def run_async(total: int, concurrency: int, pool_size: int) -> dict[str, float]:
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+    async with AsyncMarketService(pg_min_size=pool_size, pg_max_size=pool_size) as market:
+        await market.pg()
+
+        async def one(i: int) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                await market._run_pg_query(QUERIES[i % len(QUERIES)], None, None, 20)
+                latencies.append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256])
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--pool-size", type=int, default=10)
+    args = ap.parse_args()
+
+    rows = []
+    for n in args.concurrency:
+        pool = PostgresPool(min_size=0, max_size=args.pool_size, timeout=120)
+        service = ProductSearchService(pool=pool)
+        sync = run_concurrent(
+            lambda i, service=service: service._run_pg_query(QUERIES[i % len(QUERIES)], None, None, 20),
+            args.requests,
+            n,
+        )
+        pool.close()
+        rows.append({"mode": "sync-threads", "concurrency": n, **sync})
+        rows.append({"mode": "asyncio", "concurrency": n, **asyncio.run(run_async(args.requests, n, args.pool_size))})
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
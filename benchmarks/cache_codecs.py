@@ -0,0 +1,63 @@
+"""
+Encode/decode time and stored bytes of every available cache codec for
+``ProductSearchService``-shaped payloads (id, name, price_cents, rank rows).
+No database needed.
+
+    uv run python -m benchmarks.cache_codecs --sizes 20 100 1000 --repeat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+
+from benchmarks.common import print_table, time_calls
+from src.db.codecs import COMPRESSORS, SERIALIZERS, Codec
+
+WORDS = ["handmade", "ceramic", "oak", "linen", "silver", "leather", "candle", "wool", "mug", "scarf"]
+
+
+def search_rows(n: int, seed: int = 0) -> list[dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": rnd.randint(1, 1_000_000),
+            "name": " ".join(rnd.choices(WORDS, k=4)).title(),
+            "price_cents": rnd.randint(500, 50_000),
+            "rank": rnd.random(),
+        }
+        for _ in range(n)
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="rows per cached result")
+    ap.add_argument("--repeat", type=int, default=2000)
+    ap.add_argument("--threshold", type=int, default=1024, help="compress payloads at least this many bytes")
+    args = ap.parse_args()
+
+    specs = [s if c == "none" else f"{s}+{c}" for s in SERIALIZERS for c in COMPRESSORS]
+    rows = []
+    for n in args.sizes:
+        payload = search_rows(n)
+        for spec in specs:
+            codec = Codec(spec, args.threshold)
+            blob = codec.encode(payload)
+            assert Codec.decode(blob) == payload
+            enc = time_calls(lambda codec=codec, payload=payload: codec.encode(payload), args.repeat)
+            dec = time_calls(lambda blob=blob: Codec.decode(blob), args.repeat)
+            rows.append(
+                {
+                    "rows": n,
+                    "codec": spec,
+                    "bytes": len(blob),
+                    "encode_us": enc["mean_ms"] * 1000,
+                    "decode_us": dec["mean_ms"] * 1000,
+                }
+            )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
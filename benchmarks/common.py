@@ -0,0 +1,64 @@
+"""Small timing helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (pct in 0‥100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """p50 / p99 / mean latency in ms plus throughput for one run."""
+    return {
+        "n": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "qps": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def run_concurrent(fn: Callable[[int], Any], total: int, threads: int) -> dict[str, float]:
+    """Call ``fn(i)`` for i in range(total) from ``threads`` workers and time each call."""
+    latencies: list[float] = []
+
+    def one(i: int) -> None:
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(one, range(total)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def time_calls(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Call ``fn`` sequentially ``repeat`` times and summarize."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def print_table(rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    cols = list(rows[0])
+    print("  ".join(f"{c:>15}" for c in cols))
+    for r in rows:
+        print("  ".join(f"{r[c]:>15.2f}" if isinstance(r[c], float) else f"{r[c]!s:>15}" for c in cols))
@@ -0,0 +1,92 @@
+"""
+Peak memory of reading order_items-shaped CSVs whole vs. through iter_records.
+
+    uv run python -m benchmarks.csv_memory --rows 2000000 --chunksize 50000
+
+Each mode runs in a fresh subprocess so the numbers don't share an
+allocator; both tracemalloc peak and the process's max RSS are reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.data_parser import iter_records
+
+
+def _write_items(path: Path, rows: int) -> None:
+    rng = random.Random(42)
+    with open(path, "w", newline="", encoding="utf8") as fh:
+        w = csv.writer(fh)
+        w.writerow(["order_id", "product_id", "quantity", "price"])
+        for i in range(rows):
+            w.writerow(
+                [f"O{i // 3:07}", f"P{rng.randint(1, 50_000):05}", rng.randint(1, 3), round(rng.uniform(5, 500), 2)]
+            )
+
+
+def _measure(mode: str, directory: Path, chunksize: int) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    seen = 0
+    if mode == "full":
+        records = pd.read_csv(directory / "order_items.csv").to_dict("records")
+        seen = len(records)
+    else:
+        for batch in iter_records("order_items", chunksize=chunksize, directory=directory):
+            seen += len(batch)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(
+        f"{mode:>8}  rows={seen:>10}  traced_peak={peak / 2**20:8.1f} MiB  max_rss={rss_mb:8.1f} MiB  {elapsed:6.2f}s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--chunksize", type=int, default=50_000)
+    ap.add_argument("--mode", choices=["full", "stream"], help=argparse.SUPPRESS)
+    ap.add_argument("--dir", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.mode:
+        _measure(args.mode, args.dir, args.chunksize)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        _write_items(directory / "order_items.csv", args.rows)
+        size_mb = (directory / "order_items.csv").stat().st_size / 2**20
+        print(f"order_items.csv: {args.rows} rows, {size_mb:.1f} MiB, chunksize={args.chunksize}")
+        for mode in ("full", "stream"):
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.csv_memory",
+                    "--mode",
+                    mode,
+                    "--dir",
+                    tmp,
+                    "--chunksize",
+                    str(args.chunksize),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
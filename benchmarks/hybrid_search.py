@@ -0,0 +1,56 @@
+"""
+Latency of each hybrid-search leg on its own vs. ``hybrid_search``, which
+runs both concurrently and should track the slower leg rather than the sum.
+
+    uv run python -m benchmarks.hybrid_search --repeat 200
+
+The embedding model is loaded up front so the first semantic call is not
+counted. Search-result caching is bypassed with ``--bypass-cache``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+
+from benchmarks.common import print_table, time_calls
+from src.services import hybrid_search_service
+from src.services.hybrid_search_service import hybrid_search
+from src.services.search_service import search_service
+from src.services.vector_search_service import warm_up
+
+QUERIES = ["handmade wooden bowl", "silver ring", "soft wool blanket", "lovely handmade", "product"]
+
+
+def _lexical_uncached(query: str, limit: int) -> list[dict]:
+    rows = search_service._run_pg_query(query, None, None, limit)
+    return [{**r, "score": r["rank"]} for r in rows]
+
+
+def _cycling(fn):
+    queries = itertools.cycle(QUERIES)
+    return lambda: fn(next(queries))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--candidates", type=int, default=50)
+    ap.add_argument("--bypass-cache", action="store_true")
+    args = ap.parse_args()
+
+    warm_up()
+    if args.bypass_cache:
+        hybrid_search_service.LEGS["lexical"] = _lexical_uncached
+    legs = hybrid_search_service.LEGS
+
+    rows = [
+        {"call": "lexical", **time_calls(_cycling(lambda q: legs["lexical"](q, args.candidates)), args.repeat)},
+        {"call": "semantic", **time_calls(_cycling(lambda q: legs["semantic"](q, args.candidates)), args.repeat)},
+        {"call": "hybrid", **time_calls(_cycling(lambda q: hybrid_search(q, candidates=args.candidates)), args.repeat)},
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Time ``import src.services.vector_search_service`` in a fresh interpreter and
+confirm the import neither loads the embedding model nor opens a connection.
+
+    uv run python -m benchmarks.import_time --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.services.vector_search_service
+elapsed = time.perf_counter() - t0
+from src.db.postgres_client import db
+from src.utils import embedding_model
+print(json.dumps({
+    "seconds": elapsed,
+    "sentence_transformers_imported": "sentence_transformers" in sys.modules,
+    "torch_imported": "torch" in sys.modules,
+    "model_loaded": embedding_model.is_loaded(),
+    "pg_pool_created": db._pool is not None,
+}))
+"""
+
+
+def probe() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    runs = [probe() for _ in range(args.repeat)]
+    times = [r["seconds"] * 1000 for r in runs]
+    print(
+        f"import src.services.vector_search_service: median {statistics.median(times):.1f} ms, max {max(times):.1f} ms"
+    )
+    for key in ("sentence_transformers_imported", "torch_imported", "model_loaded", "pg_pool_created"):
+        print(f"  {key:<32} {any(r[key] for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
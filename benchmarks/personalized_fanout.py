@@ -0,0 +1,151 @@
+"""
+Personalized recommendations on a synthetic power-law purchase graph:
+the unbounded traversal vs. ``personalized_bounded``, for the heaviest
+buyers and for typical ones.
+
+    uv run python -m benchmarks.personalized_fanout --users 20000 --products 2000 --purchases 200000
+
+User activity and product popularity both follow a Zipf-like law, so a few
+users and bestsellers own most PURCHASED edges, which is where the
+unbounded query blows up. Synthetic nodes get ids from ``--id-offset`` up
+and are deleted afterwards unless ``--keep`` is given. Both modes run with
+the same server-side timeout (``--budget``). Unbounded calls that hit it
+count as timeouts at the budget's latency. Bounded calls fall back to the
+co-purchase lists as in production and are timed in full. The result cache
+is bypassed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+from neo4j import Query
+from neo4j.exceptions import ClientError, TransientError
+
+from benchmarks.common import print_table, summarize
+from src.config import (
+    PERSONALIZED_HALF_LIFE_DAYS,
+    PERSONALIZED_MAX_BUYERS,
+    PERSONALIZED_MAX_ITEMS,
+    PERSONALIZED_MAX_SEEDS,
+)
+from src.db.neo4j_client import neo4j_client
+from src.loaders.graph_loader import PURCHASED_CYPHER
+from src.services.recommendation_service import (
+    PERSONALIZED_CYPHER,
+    bounded_request,
+    is_timeout,
+    recommendation_service,
+)
+
+USER_CYPHER = "UNWIND $rows AS row MERGE (:User {id: row.id})"
+PRODUCT_CYPHER = "UNWIND $rows AS row MERGE (p:Product {id: row.id}) SET p.name = row.name"
+DELETE_USERS_CYPHER = "UNWIND $rows AS row MATCH (u:User {id: row.id}) DETACH DELETE u"
+DELETE_PRODUCTS_CYPHER = "UNWIND $rows AS row MATCH (p:Product {id: row.id}) DETACH DELETE p"
+
+
+def _zipf_weights(n: int, alpha: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** alpha
+    return w / w.sum()
+
+
+def build_edges(users: int, products: int, purchases: int, alpha: float, offset: int, seed: int) -> pd.DataFrame:
+    """One row per (uid, pid, date) with summed quantity, like graph_loader.purchase_edges."""
+    rng = np.random.default_rng(seed)
+    today = datetime.date.today()
+    ages = rng.exponential(180, purchases).astype(int)
+    edges = pd.DataFrame(
+        {
+            "uid": offset + rng.choice(users, purchases, p=_zipf_weights(users, alpha)),
+            "pid": offset + rng.choice(products, purchases, p=_zipf_weights(products, alpha)),
+            "date": [(today - datetime.timedelta(days=int(a))).isoformat() for a in ages],
+            "quantity": rng.integers(1, 4, purchases),
+        }
+    )
+    return edges.groupby(["uid", "pid", "date"], as_index=False, sort=False)["quantity"].sum()
+
+
+def load(edges: pd.DataFrame, users: int, products: int, offset: int) -> None:
+    start = time.perf_counter()
+    neo4j_client.create_constraints()
+    neo4j_client.write_batches(USER_CYPHER, ({"id": offset + i} for i in range(users)))
+    neo4j_client.write_batches(PRODUCT_CYPHER, ({"id": offset + j, "name": f"Synthetic {j}"} for j in range(products)))
+    neo4j_client.write_batches(PURCHASED_CYPHER, edges.astype(object).to_dict("records"))
+    print(f"loaded {len(edges)} PURCHASED edges in {time.perf_counter() - start:.1f}s")
+
+
+def unload(users: int, products: int, offset: int) -> None:
+    neo4j_client.write_batches(DELETE_USERS_CYPHER, ({"id": offset + i} for i in range(users)), 500)
+    neo4j_client.write_batches(DELETE_PRODUCTS_CYPHER, ({"id": offset + j} for j in range(products)), 500)
+
+
+def time_users(call, user_ids: list[int], repeat: int, budget: float) -> dict[str, float]:
+    latencies, timeouts = [], 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for uid in user_ids:
+            t0 = time.perf_counter()
+            try:
+                call(uid)
+            except (ClientError, TransientError) as exc:
+                if not is_timeout(exc):
+                    raise
+                timeouts += 1
+                latencies.append(budget)
+                continue
+            latencies.append(time.perf_counter() - t0)
+    return {**summarize(latencies, time.perf_counter() - start), "timeouts": timeouts}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--users", type=int, default=20000)
+    ap.add_argument("--products", type=int, default=2000)
+    ap.add_argument("--purchases", type=int, default=200000)
+    ap.add_argument("--alpha", type=float, default=1.1, help="Zipf exponent of user activity and product popularity")
+    ap.add_argument("--sample-users", type=int, default=5, help="users timed per group")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget", type=float, default=10.0, help="server-side timeout per call, seconds")
+    ap.add_argument("--id-offset", type=int, default=10_000_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--keep", action="store_true", help="leave the synthetic graph in place")
+    args = ap.parse_args()
+
+    edges = build_edges(args.users, args.products, args.purchases, args.alpha, args.id_offset, args.seed)
+    per_user = edges.groupby("uid").size().sort_values(ascending=False)
+    groups = {
+        "heavy": per_user.index[: args.sample_users].tolist(),
+        # closest to the median: with an even user count the median may match nobody exactly
+        "typical": (per_user - per_user.median()).abs().nsmallest(args.sample_users).index.tolist(),
+    }
+
+    def unbounded(uid: int) -> None:
+        with neo4j_client.driver.session() as s:
+            s.run(Query(PERSONALIZED_CYPHER, timeout=args.budget), uid=uid, lim=10).consume()
+
+    caps = (PERSONALIZED_MAX_SEEDS, PERSONALIZED_MAX_BUYERS, PERSONALIZED_MAX_ITEMS, PERSONALIZED_HALF_LIFE_DAYS)
+
+    def bounded(uid: int) -> None:
+        _, params = bounded_request(uid, 10, *caps)
+        recommendation_service._personalized_bounded(params, args.budget)
+
+    try:
+        load(edges, args.users, args.products, args.id_offset)
+        rows = []
+        for group, user_ids in groups.items():
+            edges_per_user = int(per_user[user_ids].mean())
+            for mode, call in (("unbounded", unbounded), ("bounded", bounded)):
+                stats = time_users(call, user_ids, args.repeat, args.budget)
+                rows.append({"users": group, "edges/user": edges_per_user, "mode": mode, **stats})
+        print_table(rows)
+    finally:
+        if not args.keep:
+            unload(args.users, args.products, args.id_offset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Product page latency: each section fetched one after another vs.
+``get_product_page`` fanning out (cold cache) vs. a fully cached page.
+
+    uv run python -m benchmarks.product_page --products 1 50 --repeat 100
+
+The cold runs drop the page's cached sections before every call. Sections
+that miss ``--timeout`` are reported by the aggregator as missing, so keep
+it generous when comparing against the sequential baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+
+from benchmarks.common import print_table, time_calls
+from src.services import product_page_service
+from src.services.product_page_service import get_product_page, invalidate_product_page
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--products", type=int, nargs=2, default=[1, 50], metavar=("FIRST", "LAST"))
+    ap.add_argument("--repeat", type=int, default=100)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    args = ap.parse_args()
+
+    ids = itertools.cycle(range(args.products[0], args.products[1] + 1))
+    timeouts = dict.fromkeys(product_page_service.SECTIONS, args.timeout)
+
+    def sequential() -> None:
+        pid = next(ids)
+        for leg in product_page_service.SECTIONS.values():
+            leg(pid)
+
+    def cold() -> None:
+        pid = next(ids)
+        invalidate_product_page(pid)
+        get_product_page(pid, timeouts)
+
+    get_product_page(args.products[0], timeouts)  # open pools and load the embedding model
+    rows = [
+        {"mode": "sequential", **time_calls(sequential, args.repeat)},
+        {"mode": "fan-out (cold)", **time_calls(cold, args.repeat)},
+        {"mode": "fan-out (cached)", **time_calls(lambda: get_product_page(next(ids), timeouts), args.repeat)},
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Load test: rate-limit checks per second for each algorithm.
+
+    uv run python -m benchmarks.rate_limit --checks 20000 --threads 16 --users 500
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import print_table, run_concurrent
+from src.db.redis_client import redis_client
+from src.db.redis_scripts import RATE_LIMIT_SCRIPTS
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--checks", type=int, default=10_000)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--window", type=int, default=60)
+    args = ap.parse_args()
+
+    rows = []
+    for algorithm in RATE_LIMIT_SCRIPTS:
+        endpoint = f"bench-{algorithm}"
+        redis_client.set_rate_limit_policy(endpoint, algorithm, args.limit, args.window)
+        allowed: list[int] = []  # list.append is atomic across worker threads
+
+        def check(i: int, endpoint=endpoint, allowed=allowed) -> None:
+            if redis_client.rate_limit(f"U{i % args.users}", endpoint).allowed:
+                allowed.append(i)
+
+        result = run_concurrent(check, args.checks, args.threads)
+        rows.append(
+            {
+                "algorithm": algorithm,
+                "checks/s": result["qps"],
+                "p50_ms": result["p50_ms"],
+                "p99_ms": result["p99_ms"],
+                "allowed": len(allowed),
+            }
+        )
+        for key in redis_client.client.scan_iter(f"rl:*{endpoint}*"):
+            redis_client.client.delete(key)
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Cart operations: two-command calls vs. pipelined MULTI/EXEC and bulk APIs.
+
+    uv run python -m benchmarks.redis_cart --ops 5000 --users 200
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import print_table, time_calls
+from src.config import CART_TTL
+from src.db.redis_client import redis_client
+
+
+def _legacy_add(user_id: str, product_id: str, qty: int) -> None:
+    """The pre-pipeline add_to_cart: HINCRBY then EXPIRE, two round-trips."""
+    key = redis_client._cart_key(user_id)
+    redis_client.client.hincrby(key, product_id, qty)
+    redis_client.client.expire(key, CART_TTL)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--ops", type=int, default=2000)
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--items", type=int, default=10, help="products per bulk add")
+    args = ap.parse_args()
+
+    users = [f"bench-U{i}" for i in range(args.users)]
+    items = {f"P{i:03}": 1 for i in range(args.items)}
+    counter = iter(range(10**9))
+
+    def next_user() -> str:
+        return users[next(counter) % len(users)]
+
+    rows = [
+        {"op": "add (2 cmds)", **time_calls(lambda: _legacy_add(next_user(), "P001", 1), args.ops)},
+        {"op": "add (pipeline)", **time_calls(lambda: redis_client.add_to_cart(next_user(), "P001", 1), args.ops)},
+    ]
+    n_bulk = max(1, args.ops // args.items)
+
+    def add_loop():
+        uid = next_user()
+        for pid, qty in items.items():
+            redis_client.add_to_cart(uid, pid, qty)
+
+    rows.append({"op": f"{args.items}x add_to_cart", **time_calls(add_loop, n_bulk)})
+    rows.append(
+        {"op": "add_many_to_cart", **time_calls(lambda: redis_client.add_many_to_cart(next_user(), items), n_bulk)}
+    )
+
+    def get_loop():
+        for uid in users:
+            redis_client.get_cart(uid)
+
+    n_reads = max(1, args.ops // args.users)
+    rows.append({"op": f"{args.users}x get_cart", **time_calls(get_loop, n_reads)})
+    rows.append({"op": "get_carts", **time_calls(lambda: redis_client.get_carts(users), n_reads)})
+
+    for uid in users:
+        redis_client.clear_cart(uid)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Drive ProductSearchService.search() from N threads and report latency / QPS.
+
+    uv run python -m benchmarks.search_concurrency --threads 1 2 4 8 16 --requests 2000
+
+``--bypass-cache`` runs the Postgres query directly so the numbers reflect
+connection-pool contention rather than Redis hits.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import print_table, run_concurrent
+from src.db.postgres_client import PostgresPool
+from src.services.search_service import ProductSearchService
+
+QUERIES = ["handmade", "product", "lovely", "lovely handmade", "product 1", "wooden bowl"]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--pool-size", type=int, default=10)
+    ap.add_argument("--bypass-cache", action="store_true")
+    args = ap.parse_args()
+
+    rows = []
+    for n in args.threads:
+        pool = PostgresPool(min_size=0, max_size=args.pool_size)
+        service = ProductSearchService(pool=pool)
+        if args.bypass_cache:
+
+            def call(i: int, service=service) -> None:
+                service._run_pg_query(QUERIES[i % len(QUERIES)], None, None, 20)
+        else:
+
+            def call(i: int, service=service) -> None:
+                service.search(QUERIES[i % len(QUERIES)], limit=20)
+
+        result = run_concurrent(call, args.requests, n)
+        pool_stats = pool.stats()
+        rows.append({"threads": n, **result, "pool_waits": pool_stats["waits"], "conns": pool_stats["created"]})
+        pool.close()
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
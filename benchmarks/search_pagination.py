@@ -0,0 +1,57 @@
+"""
+Latency of reaching page N of a full-text search: keyset ``search_page``
+cursors vs. fetching ``limit = N * page_size`` and slicing, which is what a
+client had to do before. Both bypass Redis so the numbers are Postgres time.
+
+    uv run python -m benchmarks.search_pagination --query product --pages 1 10 50 100 --page-size 20
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from benchmarks.common import print_table, time_calls
+from src.services.search_service import ProductSearchService
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--query", default="product")
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 100])
+    ap.add_argument("--page-size", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    service = ProductSearchService()
+    q, size = args.query, args.page_size
+
+    # walk the cursors once to know the (rank, id) each page starts after
+    afters: list[tuple[float, int] | None] = [None]
+    while len(afters) < max(args.pages):
+        rows = service._run_pg_page(q, None, None, size, afters[-1])
+        if len(rows) < size:
+            break
+        afters.append((rows[-1]["rank"], rows[-1]["id"]))
+
+    rows = []
+    for page in args.pages:
+        if page > len(afters):
+            print(f"only {len(afters)} pages match {args.query!r}; skipping page {page}")
+            continue
+        after = afters[page - 1]
+        keyset = time_calls(lambda after=after: service._run_pg_page(q, None, None, size, after), args.repeat)
+        sliced = time_calls(lambda page=page: service._run_pg_query(q, None, None, page * size)[-size:], args.repeat)
+        rows.append(
+            {
+                "page": page,
+                "keyset_p50_ms": keyset["p50_ms"],
+                "keyset_p99_ms": keyset["p99_ms"],
+                "limit_p50_ms": sliced["p50_ms"],
+                "limit_p99_ms": sliced["p99_ms"],
+            }
+        )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
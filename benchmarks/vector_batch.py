@@ -0,0 +1,67 @@
+"""
+Looped single-item semantic search vs. the batch API.
+
+    uv run python -m benchmarks.vector_batch --n 500 --limit 5
+
+The query-embedding cache is cleared and its Redis tier disabled before each
+text run so both sides pay for encoding.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.db.postgres_client import db
+from src.services import vector_search_service as vs
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=200, help="product ids / queries per run")
+    ap.add_argument("--limit", type=int, default=5)
+    args = ap.parse_args()
+
+    vs.warm_up()
+    vs.query_cache.use_redis = False
+
+    with db.get_cursor() as cur:
+        cur.execute("SELECT product_id FROM product_embeddings ORDER BY product_id LIMIT %s", (args.n,))
+        ids = [r["product_id"] for r in cur.fetchall()]
+    queries = [f"handmade gift idea {i}" for i in range(args.n)]
+
+    def loop_products():
+        for pid in ids:
+            vs.similar_to_product(pid, args.limit)
+
+    def loop_texts():
+        for q in queries:
+            vs.similar_by_text(q, args.limit)
+
+    results = [
+        (
+            "similar_to_product",
+            len(ids),
+            _timed(loop_products),
+            _timed(lambda: vs.similar_to_products_many(ids, args.limit)),
+        )
+    ]
+    vs.query_cache.clear()
+    looped = _timed(loop_texts)
+    vs.query_cache.clear()
+    batched = _timed(lambda: vs.similar_by_text_many(queries, args.limit))
+    results.append(("similar_by_text", len(queries), looped, batched))
+
+    print(f"{'api':<20}{'n':>6}{'looped s':>12}{'batch s':>12}{'speed-up':>10}")
+    for name, n, looped_s, batch_s in results:
+        print(f"{name:<20}{n:>6}{looped_s:>12.3f}{batch_s:>12.3f}{looped_s / batch_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
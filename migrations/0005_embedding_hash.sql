@@ -0,0 +1,4 @@
+-- sha1 of the description text each embedding was computed from;
+-- lets vector_loader skip products whose text has not changed
+ALTER TABLE product_embeddings
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
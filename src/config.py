@@ -40,6 +40,12 @@ class Neo4jConfig(TypedDict):
     password: str
 
 
+class RateLimitPolicy(TypedDict):
+    algorithm: str  # fixed_window | sliding_log | sliding_counter | token_bucket
+    limit: int
+    window: int
+
+
 # Database configurations
 POSTGRES_CONFIG: PostgresConfig = {
     "host": os.getenv("POSTGRES_HOST", "localhost"),
@@ -67,10 +73,80 @@ NEO4J_CONFIG: Neo4jConfig = {
     "password": os.getenv("NEO4J_PASSWORD", "password"),
 }
 
+# Postgres connection pool
+PG_POOL_MIN_SIZE: int = int(os.getenv("PG_POOL_MIN_SIZE", 1))
+PG_POOL_MAX_SIZE: int = int(os.getenv("PG_POOL_MAX_SIZE", 10))
+PG_POOL_TIMEOUT: float = float(os.getenv("PG_POOL_TIMEOUT", 30))  # max wait for a free connection, seconds
+PG_POOL_IDLE_TIMEOUT: float = float(os.getenv("PG_POOL_IDLE_TIMEOUT", 300))  # close surplus idle conns after, seconds
+
+# Neo4j batched writes
+NEO4J_BATCH_SIZE: int = int(os.getenv("NEO4J_BATCH_SIZE", 1000))  # rows per UNWIND write transaction
+NEO4J_MAX_RETRY_TIME: float = float(os.getenv("NEO4J_MAX_RETRY_TIME", 30))  # seconds to retry transient errors
+CO_PURCHASE_TOP_K: int = int(os.getenv("CO_PURCHASE_TOP_K", 20))  # CO_PURCHASED neighbours kept per product
+# bounded personalized recommendations: caps per hop, recency weighting and a latency budget
+PERSONALIZED_MAX_SEEDS: int = int(os.getenv("PERSONALIZED_MAX_SEEDS", 20))  # user's most recent products expanded
+PERSONALIZED_MAX_BUYERS: int = int(os.getenv("PERSONALIZED_MAX_BUYERS", 50))  # most recent co-buyers per product
+PERSONALIZED_MAX_ITEMS: int = int(os.getenv("PERSONALIZED_MAX_ITEMS", 20))  # most recent purchases per co-buyer
+PERSONALIZED_HALF_LIFE_DAYS: float = float(os.getenv("PERSONALIZED_HALF_LIFE_DAYS", 90))  # purchase weight halves after
+PERSONALIZED_BUDGET: float = float(os.getenv("PERSONALIZED_BUDGET", 0.5))  # query timeout, seconds
+
+# Embeddings
+EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", 64))  # texts per SentenceTransformer forward pass
+EMBED_CACHE_SIZE: int = int(os.getenv("EMBED_CACHE_SIZE", 4096))  # query embeddings kept in-process (LRU)
+EMBED_CACHE_TTL: int = int(os.getenv("EMBED_CACHE_TTL", 86400))  # shared Redis tier, seconds
+EMBED_CACHE_REDIS: bool = os.getenv("EMBED_CACHE_REDIS", "1") == "1"
+
+# Hybrid (lexical + semantic) search
+HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", 50))  # hits fetched from each leg before fusion
+HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", 60))  # reciprocal rank fusion damping constant
+HYBRID_WORKERS: int = int(os.getenv("HYBRID_WORKERS", 8))  # threads running the two legs
+
+# Product page aggregator
+PRODUCT_PAGE_WORKERS: int = int(os.getenv("PRODUCT_PAGE_WORKERS", 32))  # threads fetching page sections
+PRODUCT_PAGE_TIMEOUT: float = float(os.getenv("PRODUCT_PAGE_TIMEOUT", 0.3))  # per-section wait, seconds
+# loads of one section allowed in flight at once; past it the section is reported missing
+PRODUCT_PAGE_MAX_INFLIGHT: int = int(os.getenv("PRODUCT_PAGE_MAX_INFLIGHT", 8))
+# per-section overrides of the wait above, e.g. PRODUCT_PAGE_TIMEOUTS="similar=0.5,reviews=0.2"
+PRODUCT_PAGE_TIMEOUTS: dict[str, float] = {
+    name: float(secs)
+    for name, secs in (item.split("=", 1) for item in os.getenv("PRODUCT_PAGE_TIMEOUTS", "").split(",") if "=" in item)
+}
+# how long each cached section lives, seconds
+PRODUCT_PAGE_TTLS: dict[str, int] = {
+    "product": 300,  # price and name edits should show up quickly
+    "specs": 6 * 3600,
+    "reviews": 600,
+    "also_bought": 3600,
+    "similar": 24 * 3600,  # embeddings only change when the description does
+}
+
 # Cache settings
 CACHE_TTL: int = 3600  # 1 hour
 CART_TTL: int = 86400  # 24 hours
+RECO_CACHE_TTL: int = int(os.getenv("RECO_CACHE_TTL", 6 * 3600))  # recommendations; purchases evict them early
+# degraded personalized results (the traversal timed out); retried soon instead of served for hours
+RECO_FALLBACK_TTL: int = int(os.getenv("RECO_FALLBACK_TTL", 60))
+# search result cache (stampede protection, facets)
+SEARCH_STALE_TTL: int = int(os.getenv("SEARCH_STALE_TTL", 300))  # grace period for serving expired results
+SEARCH_LOCK_TTL: float = float(os.getenv("SEARCH_LOCK_TTL", 5))  # recompute lock lifetime, seconds
+SEARCH_LOCK_WAIT: float = float(os.getenv("SEARCH_LOCK_WAIT", 2))  # how long a coalesced caller waits for the result
+SEARCH_FACETS_TTL: int = int(os.getenv("SEARCH_FACETS_TTL", 6 * 3600))  # facet counts change slowly; cached longer
+SEARCH_PRICE_BUCKETS: tuple[int, ...] = (1000, 2500, 5000, 10000)  # price facet bucket edges, cents
+SEARCH_XFETCH_BETA: float = float(os.getenv("SEARCH_XFETCH_BETA", 1.0))  # >1 refreshes earlier, 0 disables
+NEAR_CACHE_SIZE: int = int(os.getenv("NEAR_CACHE_SIZE", 0))  # in-process entries over get_json; 0 disables
+NEAR_CACHE_MAX_TTL: float = float(os.getenv("NEAR_CACHE_MAX_TTL", 30))  # cap on local staleness, seconds
+# value codec for get_json/set_json: "<json|orjson|msgpack>[+<zlib|lz4>]", see src/db/codecs.py
+CACHE_CODEC: str = os.getenv("CACHE_CODEC", "json")
+CACHE_COMPRESS_MIN_BYTES: int = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))  # smaller payloads stay raw
+# per key-prefix overrides (longest prefix wins), e.g. CACHE_CODECS="search:=orjson+lz4,reco:=msgpack"
+CACHE_CODECS: dict[str, str] = dict(
+    item.split("=", 1) for item in os.getenv("CACHE_CODECS", "").split(",") if "=" in item
+)
 
 # Rate limiting
 RATE_LIMIT_REQUESTS: int = 100
 RATE_LIMIT_WINDOW: int = 60  # seconds
+RATE_LIMIT_ALGORITHM: str = os.getenv("RATE_LIMIT_ALGORITHM", "fixed_window")
+# per-endpoint overrides of the default policy above, e.g.
+# {"search": {"algorithm": "token_bucket", "limit": 20, "window": 1}}
+RATE_LIMIT_POLICIES: dict[str, RateLimitPolicy] = {}
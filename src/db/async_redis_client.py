@@ -0,0 +1,174 @@
+"""asyncio twin of :mod:`src.db.redis_client` built on ``redis.asyncio``.
+
+Keys, value encoding (including codecs) and Lua scripts are the same as the
+synchronous client, so both can serve the same data side by side.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+import redis
+import redis.asyncio as aioredis
+
+from src.config import CART_TTL, REDIS_CONFIG
+from src.db.codecs import MISS, Codec
+from src.db.near_cache import INVALIDATION_CHANNEL
+from src.db.redis_client import RateLimitResult, RedisClient, redis_client
+from src.db.redis_scripts import RATE_LIMIT_SCRIPTS, RELEASE_LOCK
+
+_log = logging.getLogger(__name__)
+
+
+class AsyncRedisClient:
+    def __init__(self, sync: RedisClient = redis_client) -> None:
+        # shares codec and rate-limit policy configuration with the sync client
+        self._sync = sync
+        self._r = aioredis.Redis(**REDIS_CONFIG)
+        self.client = self._r
+        self.raw = aioredis.Redis(**{**REDIS_CONFIG, "decode_responses": False})
+        self._rl_scripts = {name: self._r.register_script(src) for name, src in RATE_LIMIT_SCRIPTS.items()}
+        self._release_lock = self._r.register_script(RELEASE_LOCK)
+
+    async def aclose(self) -> None:
+        await self._r.aclose()
+        await self.raw.aclose()
+
+    # ──────────────────────────── JSON cache ────────────────────────────
+    async def get_json(self, key: str) -> Any | None:
+        val = await self.raw.get(key)
+        value = Codec.decode(val) if val else MISS
+        return None if value is MISS else value
+
+    async def get_many_json(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        async with self.raw.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+            values = await pipe.execute()
+        decoded = ((key, Codec.decode(val) if val else MISS) for key, val in zip(keys, values, strict=True))
+        return {key: value for key, value in decoded if value is not MISS}
+
+    async def set_json(self, key: str, value: Any, ttl: int) -> bool:
+        ok = bool(await self.raw.setex(key, ttl, self._sync.codec_for(key).encode(value)))
+        if self._sync.near is not None:
+            await self._invalidate_near(key)
+        return ok
+
+    async def delete(self, *keys: str) -> int:
+        """Delete cache keys, evicting them from every process's near-cache too."""
+        if not keys:
+            return 0
+        n = await self._r.delete(*keys)
+        if self._sync.near is not None:
+            await self._invalidate_near(*keys)
+        return n
+
+    async def _invalidate_near(self, *keys: str) -> None:
+        """:meth:`NearCache.invalidate` without blocking the loop: publishes over this client."""
+        messages = self._sync.near.drop(*keys)
+        try:
+            async with self._r.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    pipe.publish(INVALIDATION_CHANNEL, message)
+                await pipe.execute()
+        except redis.RedisError:
+            _log.warning("near-cache: invalidation publish failed", exc_info=True)
+
+    async def tag(self, key: str, tags: Iterable[str], ttl: int) -> None:
+        """:meth:`RedisClient.tag`: the tag sets' TTL only ever grows."""
+        async with self._r.pipeline(transaction=False) as pipe:
+            for t in tags:
+                pipe.sadd(f"tag:{t}", key)
+                pipe.expire(f"tag:{t}", ttl, nx=True)
+                pipe.expire(f"tag:{t}", ttl, gt=True)
+            await pipe.execute()
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key recorded under any of ``tags`` (and the tag sets); returns keys deleted."""
+        if not tags:
+            return 0
+        tag_keys = [f"tag:{t}" for t in tags]
+        keys = await self._r.sunion(tag_keys)
+        n = await self.delete(*keys)
+        await self._r.delete(*tag_keys)
+        return n
+
+    # ─────────────────────────────── locks ──────────────────────────────
+    async def acquire_lock(self, name: str, ttl: float) -> str | None:
+        """Try to take a short-lived lock; returns its token, or None if someone else holds it."""
+        token = uuid.uuid4().hex
+        return token if await self._r.set(f"lock:{name}", token, nx=True, px=max(1, int(ttl * 1000))) else None
+
+    async def release_lock(self, name: str, token: str) -> bool:
+        return bool(await self._release_lock(keys=[f"lock:{name}"], args=[token]))
+
+    # ────────────────────────── shopping cart ───────────────────────────
+    def _cart_key(self, user_id: str) -> str:
+        return f"cart:{user_id}"
+
+    async def add_to_cart(self, user_id: str, product_id: str, qty: int = 1) -> None:
+        await self.add_many_to_cart(user_id, {product_id: qty})
+
+    async def add_many_to_cart(self, user_id: str, items: dict[str, int]) -> None:
+        if not items:
+            return
+        key = self._cart_key(user_id)
+        async with self._r.pipeline(transaction=True) as pipe:
+            for product_id, qty in items.items():
+                pipe.hincrby(key, product_id, qty)
+            pipe.expire(key, CART_TTL)
+            await pipe.execute()
+
+    async def update_cart(self, user_id: str, product_id: str, qty: int) -> None:
+        key = self._cart_key(user_id)
+        async with self._r.pipeline(transaction=True) as pipe:
+            if qty <= 0:
+                pipe.hdel(key, product_id)
+            else:
+                pipe.hset(key, product_id, qty)
+            pipe.expire(key, CART_TTL)
+            await pipe.execute()
+
+    async def get_cart(self, user_id: str) -> dict[str, int]:
+        return RedisClient._decode_cart(await self._r.hgetall(self._cart_key(user_id)))
+
+    async def get_carts(self, user_ids: list[str]) -> dict[str, dict[str, int]]:
+        """Fetch many carts with one pipelined round-trip."""
+        async with self._r.pipeline(transaction=False) as pipe:
+            for uid in user_ids:
+                pipe.hgetall(self._cart_key(uid))
+            raws = await pipe.execute()
+        return {uid: RedisClient._decode_cart(raw) for uid, raw in zip(user_ids, raws, strict=True)}
+
+    async def clear_cart(self, user_id: str) -> None:
+        await self._r.delete(self._cart_key(user_id))
+
+    # ───────────────────────────── rate limit ───────────────────────────
+    async def rate_limit(self, user_id: str, endpoint: str) -> RateLimitResult:
+        policy = self._sync.rate_limit_policy(endpoint)
+        algorithm, limit, window = policy["algorithm"], policy["limit"], policy["window"]
+        if algorithm == "fixed_window":
+            key = self._sync._bucket_key(user_id, endpoint, window)
+        else:
+            key = f"rl:{algorithm}:{user_id}:{endpoint}"
+        args = [limit, window]
+        if algorithm == "sliding_log":
+            args.append(uuid.uuid4().hex)
+        allowed, remaining, retry_ms = await self._rl_scripts[algorithm](keys=[key], args=args)
+        return RateLimitResult(bool(allowed), int(remaining), int(retry_ms) / 1000)
+
+    async def rate_limit_ok(self, user_id: str, endpoint: str) -> bool:
+        return (await self.rate_limit(user_id, endpoint)).allowed
+
+    # ──────────────────────── hot products toplist ──────────────────────
+    async def record_view(self, product_id: str, score: int = 1) -> None:
+        await self._r.zincrby(self._sync._hot_key(), score, product_id)
+
+    async def get_hot_products(self, date: datetime.date | None = None, top: int = 10) -> list[tuple[str, float]]:
+        pairs = await self._r.zrevrange(self._sync._hot_key(date), 0, top - 1, withscores=True)
+        return [(pid.decode() if isinstance(pid, bytes) else pid, score) for pid, score in pairs]
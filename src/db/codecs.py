@@ -0,0 +1,149 @@
+"""Pluggable value codecs for the Redis cache.
+
+A codec spec is ``"<serializer>[+<compression>]"``, e.g. ``"json"``,
+``"orjson+zlib"`` or ``"msgpack+lz4"``. orjson, msgpack and lz4 are optional
+(``uv sync --extra fast-cache``); a spec naming a missing one
+falls back to stdlib json / zlib with a warning.
+
+Encoded values carry a 3-byte header (``\\x00``, serializer tag, compression
+tag), so a reader decodes any writer's values regardless of its own codec
+configuration, as long as it has the libraries they were written with: a
+process without the fast-cache extra cannot read orjson, msgpack or lz4
+values, and :meth:`Codec.decode` returns :data:`MISS` for them (logged once
+per format) so the caller recomputes instead of failing. Payloads without
+the header are plain JSON text as written before codecs existed.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import zlib
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+_log = logging.getLogger(__name__)
+
+MAGIC = 0
+MISS = object()  # Codec.decode result for a value this process cannot read
+
+# header tags; fixed so every process agrees on them whatever it has installed
+SER_TAGS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMP_TAGS = {"none": 0, "zlib": 1, "lz4": 2}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.date | datetime.datetime):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not serializable")
+
+
+# ─────────────────────────────── serializers ───────────────────────────────
+# name -> (tag, dumps, loads)
+SERIALIZERS: dict[str, tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (
+        SER_TAGS["json"],
+        lambda v: json.dumps(v, default=_default, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+}
+
+try:
+    import orjson
+
+    SERIALIZERS["orjson"] = (
+        SER_TAGS["orjson"],
+        lambda v: orjson.dumps(v, default=_default, option=orjson.OPT_SERIALIZE_NUMPY),
+        orjson.loads,
+    )
+except ImportError:  # pragma: no cover - optional
+    pass
+
+try:
+    import msgpack
+
+    SERIALIZERS["msgpack"] = (
+        SER_TAGS["msgpack"],
+        lambda v: msgpack.packb(v, default=_default, use_bin_type=True),
+        lambda b: msgpack.unpackb(b, raw=False),
+    )
+except ImportError:  # pragma: no cover - optional
+    pass
+
+# ─────────────────────────────── compressors ───────────────────────────────
+# name -> (tag, compress, decompress)
+COMPRESSORS: dict[str, tuple[int, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (COMP_TAGS["none"], bytes, bytes),
+    "zlib": (COMP_TAGS["zlib"], lambda b: zlib.compress(b, 1), zlib.decompress),
+}
+
+try:
+    import lz4.frame
+
+    COMPRESSORS["lz4"] = (COMP_TAGS["lz4"], lz4.frame.compress, lz4.frame.decompress)
+except ImportError:  # pragma: no cover - optional
+    pass
+
+_SER_BY_TAG = {tag: loads for tag, _, loads in SERIALIZERS.values()}
+_COMP_BY_TAG = {tag: decompress for tag, _, decompress in COMPRESSORS.values()}
+_unreadable_logged: set[str] = set()
+
+
+def _unreadable(fmt: str) -> object:
+    if fmt not in _unreadable_logged:
+        _unreadable_logged.add(fmt)
+        _log.warning(
+            "cache value written with %s cannot be read here (install the fast-cache extra); treating as a miss", fmt
+        )
+    return MISS
+
+
+def _tag_name(tags: dict[str, int], tag: int) -> str:
+    return next((name for name, t in tags.items() if t == tag), f"unknown format {tag}")
+
+
+class Codec:
+    """Serializer plus optional compression applied only above ``threshold`` bytes."""
+
+    def __init__(self, spec: str = "json", threshold: int = 1024) -> None:
+        serializer, _, compression = spec.partition("+")
+        compression = compression or "none"
+        if serializer not in SERIALIZERS:
+            _log.warning("cache codec %r unavailable, using json", serializer)
+            serializer = "json"
+        if compression not in COMPRESSORS:
+            _log.warning("cache compression %r unavailable, using zlib", compression)
+            compression = "zlib"
+        self.spec = f"{serializer}+{compression}" if compression != "none" else serializer
+        self.threshold = threshold
+        self._ser_tag, self._dumps, _ = SERIALIZERS[serializer]
+        self._comp_tag, self._compress, _ = COMPRESSORS[compression]
+
+    def encode(self, value: Any) -> bytes:
+        payload = self._dumps(value)
+        comp_tag = 0
+        if self._comp_tag and len(payload) >= self.threshold:
+            payload, comp_tag = self._compress(payload), self._comp_tag
+        return bytes((MAGIC, self._ser_tag, comp_tag)) + payload
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """Decoded value, or :data:`MISS` when it uses a format unavailable in this process."""
+        if not data or data[0] != MAGIC:
+            return json.loads(data)  # legacy plain-JSON value
+        ser_tag, comp_tag = data[1], data[2]
+        if ser_tag not in _SER_BY_TAG:
+            return _unreadable(_tag_name(SER_TAGS, ser_tag))
+        if comp_tag not in _COMP_BY_TAG:
+            return _unreadable(_tag_name(COMP_TAGS, comp_tag))
+        payload = data[3:]
+        if comp_tag:
+            payload = _COMP_BY_TAG[comp_tag](payload)
+        return _SER_BY_TAG[ser_tag](payload)
+
+    def __repr__(self) -> str:
+        return f"Codec({self.spec!r}, threshold={self.threshold})"
@@ -0,0 +1,161 @@
+"""In-process near-cache layered over Redis, kept coherent with pub/sub."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import redis
+
+_log = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+class NearCache:
+    """
+    Size-bounded LRU of decoded values with per-entry expiry.
+
+    Entries never outlive the Redis key they mirror (the caller passes the
+    key's remaining TTL) nor ``max_ttl``, which caps staleness should an
+    invalidation message be lost. Writers publish the key on
+    ``INVALIDATION_CHANNEL``; every other process drops its local copy.
+    Values are shared between callers and must be treated as read-only.
+
+    A value fetched from Redis is only kept if its own key was not
+    invalidated while the fetch was in flight, so invalidations of other
+    keys never cost a cache fill. The last invalidation of up to
+    ``max_size`` keys is remembered; for older ones only the latest of them
+    is, which errs on the side of not caching.
+    """
+
+    def __init__(self, conn: redis.Redis, max_size: int, max_ttl: float) -> None:
+        self._conn = conn
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._origin = uuid.uuid4().hex
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._clock = 0  # ticks on every invalidation
+        self._dropped: OrderedDict[str, int] = OrderedDict()  # key -> clock of its last invalidation
+        self._dropped_floor = 0  # latest clock among invalidations no longer in _dropped
+        self._stats = {"local_hits": 0, "remote_hits": 0, "misses": 0, "invalidations": 0}
+
+    # ───────────────────────────── lookups ─────────────────────────────
+    def get(self, key: str) -> tuple[bool, Any]:
+        self._ensure_listener()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._stats["local_hits"] += 1
+                    return True, entry[1]
+                del self._data[key]
+        return False, None
+
+    @property
+    def clock(self) -> int:
+        return self._clock
+
+    def put(self, key: str, value: Any, ttl: float | None, clock: int) -> None:
+        """
+        Store a value just fetched from Redis; ``ttl`` is the key's remaining
+        TTL in seconds and ``clock`` the value of :attr:`clock` read before the
+        fetch. If ``key`` was invalidated in between, the value may already be
+        stale and is not kept.
+        """
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        with self._lock:
+            self._stats["remote_hits"] += 1
+            if ttl <= 0 or self._dropped.get(key, self._dropped_floor) > clock:
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._stats["misses"] += 1
+
+    # ─────────────────────────── invalidation ──────────────────────────
+    def invalidate(self, *keys: str) -> None:
+        """Drop ``keys`` locally and tell every other process to do the same."""
+        messages = self.drop(*keys)
+        try:
+            with self._conn.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    pipe.publish(INVALIDATION_CHANNEL, message)
+                pipe.execute()
+        except redis.RedisError:
+            _log.warning("near-cache: invalidation publish failed", exc_info=True)
+
+    def drop(self, *keys: str) -> list[str]:
+        """
+        Drop ``keys`` locally only and return the messages that make every other
+        process drop them too, for callers that publish them on
+        ``INVALIDATION_CHANNEL`` over their own connection (e.g. an asyncio one).
+        """
+        self._drop(keys)
+        return [f"{self._origin}:{key}" for key in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock += 1
+            self._dropped_floor = self._clock  # every fetch in flight is suspect
+            self._dropped.clear()
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._data)}
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    # ──────────────────────────── internals ────────────────────────────
+    def _drop(self, keys) -> None:
+        with self._lock:
+            self._clock += 1
+            for key in keys:
+                self._dropped[key] = self._clock
+                self._dropped.move_to_end(key)
+                if self._data.pop(key, None) is not None:
+                    self._stats["invalidations"] += 1
+            while len(self._dropped) > self.max_size:
+                self._dropped_floor = max(self._dropped_floor, self._dropped.popitem(last=False)[1])
+
+    def _on_message(self, message: dict) -> None:
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, _, key = data.partition(":")
+        if origin != self._origin:
+            self._drop([key])
+
+    def _on_error(self, exc: Exception, pubsub, thread) -> None:
+        # Missed messages can't be replayed, so forget everything rather than
+        # serve entries that may have been invalidated meanwhile.
+        _log.warning("near-cache: invalidation listener failed (%s); clearing local cache", exc)
+        self.clear()
+        thread.stop()
+        pubsub.close()
+        self._listener = None
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            pubsub = self._conn.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_message})
+            self._listener = pubsub.run_in_thread(sleep_time=0.01, daemon=True, exception_handler=self._on_error)
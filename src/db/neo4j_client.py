@@ -1,8 +1,18 @@
 """Neo4j connection and utilities."""
 
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any
+
 from neo4j import GraphDatabase
 
-from src.config import NEO4J_CONFIG
+from src.config import NEO4J_BATCH_SIZE, NEO4J_CONFIG, NEO4J_MAX_RETRY_TIME
+
+
+def _batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
 
 
 class Neo4jClient:
@@ -10,6 +20,7 @@ class Neo4jClient:
         self.driver = GraphDatabase.driver(
             NEO4J_CONFIG["uri"],
             auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]),
+            max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
         )
 
     def close(self):
@@ -21,5 +32,32 @@ class Neo4jClient:
             s.run("CREATE CONSTRAINT product_id IF NOT EXISTS FOR (p:Product) REQUIRE p.id IS UNIQUE")
             s.run("CREATE CONSTRAINT category_id IF NOT EXISTS FOR (c:Category) REQUIRE c.id IS UNIQUE")
 
+    def write_batches(
+        self,
+        cypher: str,
+        rows: Iterable[dict[str, Any]],
+        batch_size: int = NEO4J_BATCH_SIZE,
+    ) -> dict[str, int]:
+        """
+        Run ``cypher`` once per ``batch_size`` rows, passing the batch as ``$rows``
+        (so the statement should start with ``UNWIND $rows AS row``).
+
+        Each batch is its own managed write transaction, which the driver
+        retries with backoff on transient errors (deadlocks, leader switches)
+        for up to ``NEO4J_MAX_RETRY_TIME`` seconds. Returns summed counters.
+        """
+
+        def _write(tx, batch):
+            return tx.run(cypher, rows=batch).consume().counters
+
+        totals = {"rows": 0, "nodes_created": 0, "relationships_created": 0}
+        with self.driver.session() as s:
+            for batch in _batched(rows, batch_size):
+                counters = s.execute_write(_write, batch)
+                totals["rows"] += len(batch)
+                totals["nodes_created"] += counters.nodes_created
+                totals["relationships_created"] += counters.relationships_created
+        return totals
+
 
 neo4j_client = Neo4jClient()
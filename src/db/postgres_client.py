@@ -1,22 +1,225 @@
 """PostgreSQL connection and utilities."""
 
-from contextlib import contextmanager
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, suppress
+from typing import Any
 
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from psycopg2.extras import RealDictCursor
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from src.config import POSTGRES_CONFIG
+from src.config import (
+    PG_POOL_IDLE_TIMEOUT,
+    PG_POOL_MAX_SIZE,
+    PG_POOL_MIN_SIZE,
+    PG_POOL_TIMEOUT,
+    POSTGRES_CONFIG,
+)
 
 Base = declarative_base()
 
+_log = logging.getLogger(__name__)
+
+
+class PoolError(Exception):
+    """Raised when a connection cannot be handed out by the pool."""
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+class PostgresPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    Connections are opened lazily up to ``max_size``; callers beyond that wait
+    up to ``timeout`` seconds for one to be returned. Idle connections above
+    ``min_size`` are closed once unused for ``idle_timeout`` seconds, and a
+    connection that sat idle longer than ``check_after`` is pinged before
+    being handed out.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        min_size: int = PG_POOL_MIN_SIZE,
+        max_size: int = PG_POOL_MAX_SIZE,
+        timeout: float = PG_POOL_TIMEOUT,
+        idle_timeout: float = PG_POOL_IDLE_TIMEOUT,
+        check_after: float = 30.0,
+    ) -> None:
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"invalid pool size: min={min_size} max={max_size}")
+        self.config = dict(config or POSTGRES_CONFIG)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+
+        self._cond = threading.Condition()
+        self._idle: deque[tuple[Any, float]] = deque()  # (conn, last_used), oldest on the left
+        self._size = 0  # open connections, idle + checked out
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "reaped": 0,
+        }
+
+    # ─────────────────────────── checkout / checkin ───────────────────────────
+    def getconn(self):
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("pool is closed")
+                self._reap_locked(time.monotonic())
+                if self._idle:
+                    conn, last_used = self._idle.pop()  # most recently used first
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"no connection available within {self.timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_time"] += time.monotonic() - start
+
+        if conn is not None and self._healthy(conn, last_used):
+            return conn
+        if conn is not None:
+            self._discard(conn, keep_slot=True)
+        try:
+            conn = psycopg2.connect(**self.config)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        if not close and not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                close = True
+        if close or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._reap_locked(time.monotonic())
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; commit on success, roll back on error."""
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    _log.warning("rollback failed, dropping connection", exc_info=True)
+            raise
+        finally:
+            self.putconn(conn)
+
+    @contextmanager
+    def cursor(self, cursor_factory=RealDictCursor):
+        with self.connection() as conn, conn.cursor(cursor_factory=cursor_factory) as cur:
+            yield cur
+
+    # ─────────────────────────────── lifecycle ────────────────────────────────
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                conn.close()
+                self._size -= 1
+            self._cond.notify_all()
+
+    # ──────────────────────────── internal helpers ────────────────────────────
+    def _healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn, keep_slot: bool = False) -> None:
+        with suppress(psycopg2.Error):
+            conn.close()
+        with self._cond:
+            self._stats["discarded"] += 1
+            if not keep_slot:
+                self._size -= 1
+                self._cond.notify()
+
+    def _reap_locked(self, now: float) -> None:
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            conn.close()
+            self._size -= 1
+            self._stats["reaped"] += 1
+
 
 class PostgresConnection:
     def __init__(self):
         self.config = POSTGRES_CONFIG
         self._engine = None
         self._session_factory = None
+        self._pool: PostgresPool | None = None
+        self._pool_lock = threading.Lock()
 
     @property
     def engine(self):
@@ -34,21 +237,26 @@ class PostgresConnection:
             self._session_factory = sessionmaker(bind=self.engine)
         return self._session_factory
 
+    @property
+    def pool(self) -> PostgresPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = PostgresPool(self.config)
+        return self._pool
+
     @contextmanager
     def get_cursor(self):
-        conn = psycopg2.connect(**self.config)
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                yield cursor
-                conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        with self.pool.cursor() as cursor:
+            yield cursor
 
     def create_tables(self):
         pass
 
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+
 
 db = PostgresConnection()
+atexit.register(db.close)
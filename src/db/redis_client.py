@@ -3,27 +3,199 @@
 from __future__ import annotations
 
 import datetime
-import json
 import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import Any
 
 import redis
 
-from src.config import CART_TTL, RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW, REDIS_CONFIG
+from src.config import (
+    CACHE_CODEC,
+    CACHE_CODECS,
+    CACHE_COMPRESS_MIN_BYTES,
+    CART_TTL,
+    NEAR_CACHE_MAX_TTL,
+    NEAR_CACHE_SIZE,
+    RATE_LIMIT_ALGORITHM,
+    RATE_LIMIT_POLICIES,
+    RATE_LIMIT_REQUESTS,
+    RATE_LIMIT_WINDOW,
+    REDIS_CONFIG,
+    RateLimitPolicy,
+)
+from src.db.codecs import MISS, Codec
+from src.db.near_cache import NearCache
+from src.db.redis_scripts import RATE_LIMIT_SCRIPTS, RELEASE_LOCK
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until a request would be allowed again; 0 when allowed
 
 
 class RedisClient:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        near_cache_size: int = NEAR_CACHE_SIZE,
+        codec: str = CACHE_CODEC,
+        codecs: dict[str, str] | None = None,
+    ) -> None:
         self._r = redis.Redis(**REDIS_CONFIG)
         self.client = self._r
+        # binary-safe twin for payloads that are not UTF-8 text (e.g. packed float32 vectors)
+        self.raw = redis.Redis(**{**REDIS_CONFIG, "decode_responses": False})
+        self._rl_scripts = {name: self._r.register_script(src) for name, src in RATE_LIMIT_SCRIPTS.items()}
+        self._release_lock = self._r.register_script(RELEASE_LOCK)
+        self._rl_policies: dict[str, RateLimitPolicy] = dict(RATE_LIMIT_POLICIES)
+        self.near = NearCache(self._r, near_cache_size, NEAR_CACHE_MAX_TTL) if near_cache_size > 0 else None
+        self.codec = Codec(codec, CACHE_COMPRESS_MIN_BYTES)
+        # longest prefix first so "search:facets:" beats "search:"
+        self._codecs = sorted(
+            ((prefix, Codec(spec, CACHE_COMPRESS_MIN_BYTES)) for prefix, spec in (codecs or CACHE_CODECS).items()),
+            key=lambda pc: len(pc[0]),
+            reverse=True,
+        )
 
     # ──────────────────────────── JSON cache ────────────────────────────
+    def codec_for(self, key: str) -> Codec:
+        """Codec used to write ``key``; reads are self-describing and work with any codec."""
+        for prefix, codec in self._codecs:
+            if key.startswith(prefix):
+                return codec
+        return self.codec
+
     def get_json(self, key: str) -> Any | None:
-        val = self._r.get(key)
-        return json.loads(val) if val else None
+        if self.near is None:
+            val = self.raw.get(key)
+            value = Codec.decode(val) if val else MISS
+            return None if value is MISS else value
+
+        hit, value = self.near.get(key)
+        if hit:
+            return value
+        clock = self.near.clock
+        with self.raw.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            val, pttl = pipe.execute()
+        value = Codec.decode(val) if val else MISS
+        if value is MISS:
+            self.near.record_miss()
+            return None
+        self.near.put(key, value, pttl / 1000 if pttl > 0 else None, clock)
+        return value
+
+    def get_many_json(self, keys: Iterable[str]) -> dict[str, Any]:
+        """:meth:`get_json` for several keys in one round trip; missing keys are left out."""
+        found: dict[str, Any] = {}
+        todo = []
+        for key in keys:
+            hit, value = self.near.get(key) if self.near is not None else (False, None)
+            if hit:
+                found[key] = value
+            else:
+                todo.append(key)
+        if not todo:
+            return found
+
+        clock = self.near.clock if self.near is not None else 0
+        with self.raw.pipeline(transaction=False) as pipe:
+            for key in todo:
+                pipe.get(key)
+                if self.near is not None:
+                    pipe.pttl(key)
+            replies = pipe.execute()
+        step = 1 if self.near is None else 2
+        for i, key in enumerate(todo):
+            val = replies[i * step]
+            value = Codec.decode(val) if val else MISS
+            if value is MISS:
+                if self.near is not None:
+                    self.near.record_miss()
+                continue
+            found[key] = value
+            if self.near is not None:
+                pttl = replies[i * step + 1]
+                self.near.put(key, value, pttl / 1000 if pttl > 0 else None, clock)
+        return found
 
     def set_json(self, key: str, value: Any, ttl: int) -> bool:
-        return bool(self._r.setex(key, ttl, json.dumps(value)))
+        ok = bool(self.raw.setex(key, ttl, self.codec_for(key).encode(value)))
+        if self.near is not None:
+            self.near.invalidate(key)
+        return ok
+
+    def delete(self, *keys: str) -> int:
+        """Delete cache keys, evicting them from every process's near-cache too."""
+        if not keys:
+            return 0
+        n = self._r.delete(*keys)
+        if self.near is not None:
+            self.near.invalidate(*keys)
+        return n
+
+    # ───────────────────────────── tag sets ─────────────────────────────
+    def tag(self, key: str, tags: Iterable[str], ttl: int) -> None:
+        """
+        Record ``key`` under each tag so :meth:`invalidate_tags` can evict it later.
+
+        A tag set is shared by entries with different TTLs (e.g. 1h search pages
+        and 6h facets), so its TTL only ever grows: NX sets it on a new set, GT
+        extends it, and a shorter-lived entry never cuts it below a longer one.
+        """
+        with self._r.pipeline(transaction=False) as pipe:
+            for t in tags:
+                pipe.sadd(f"tag:{t}", key)
+                pipe.expire(f"tag:{t}", ttl, nx=True)
+                pipe.expire(f"tag:{t}", ttl, gt=True)
+            pipe.execute()
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key recorded under any of ``tags`` (and the tag sets); returns keys deleted."""
+        if not tags:
+            return 0
+        tag_keys = [f"tag:{t}" for t in tags]
+        keys = self._r.sunion(tag_keys)
+        n = self.delete(*keys)
+        self._r.delete(*tag_keys)
+        return n
+
+    def delete_matching(self, pattern: str, batch: int = 1000) -> int:
+        """
+        Delete every key matching ``pattern`` without blocking the server:
+        keys come from an incremental SCAN and are UNLINKed (freed in the
+        background) ``batch`` at a time. Returns keys deleted.
+        """
+        n, keys = 0, []
+        for key in self._r.scan_iter(match=pattern, count=batch):
+            keys.append(key)
+            if len(keys) == batch:
+                n += self._unlink(keys)
+                keys = []
+        return n + (self._unlink(keys) if keys else 0)
+
+    def _unlink(self, keys: list[str]) -> int:
+        n = self._r.unlink(*keys)
+        if self.near is not None:
+            self.near.invalidate(*keys)
+        return n
+
+    def near_cache_stats(self) -> dict[str, int]:
+        """Local vs. remote hit counters of the near-cache (empty when disabled)."""
+        return self.near.stats() if self.near is not None else {}
+
+    # ─────────────────────────────── locks ──────────────────────────────
+    def acquire_lock(self, name: str, ttl: float) -> str | None:
+        """Try to take a short-lived lock; returns its token, or None if someone else holds it."""
+        token = uuid.uuid4().hex
+        return token if self._r.set(f"lock:{name}", token, nx=True, px=max(1, int(ttl * 1000))) else None
+
+    def release_lock(self, name: str, token: str) -> bool:
+        return bool(self._release_lock(keys=[f"lock:{name}"], args=[token]))
 
     # ────────────────────────── shopping cart ───────────────────────────
     def _cart_key(self, user_id: str) -> str:
@@ -31,36 +203,83 @@ class RedisClient:
 
     def add_to_cart(self, user_id: str, product_id: str, qty: int = 1) -> None:
         key = self._cart_key(user_id)
-        self._r.hincrby(key, product_id, qty)
-        self._r.expire(key, CART_TTL)
+        with self._r.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, product_id, qty)
+            pipe.expire(key, CART_TTL)
+            pipe.execute()
+
+    def add_many_to_cart(self, user_id: str, items: dict[str, int]) -> None:
+        """Increment several products in one MULTI/EXEC round-trip."""
+        if not items:
+            return
+        key = self._cart_key(user_id)
+        with self._r.pipeline(transaction=True) as pipe:
+            for product_id, qty in items.items():
+                pipe.hincrby(key, product_id, qty)
+            pipe.expire(key, CART_TTL)
+            pipe.execute()
 
     def update_cart(self, user_id: str, product_id: str, qty: int) -> None:
         key = self._cart_key(user_id)
-        if qty <= 0:
-            self._r.hdel(key, product_id)
-        else:
-            self._r.hset(key, product_id, qty)
-        self._r.expire(key, CART_TTL)
+        with self._r.pipeline(transaction=True) as pipe:
+            if qty <= 0:
+                pipe.hdel(key, product_id)
+            else:
+                pipe.hset(key, product_id, qty)
+            pipe.expire(key, CART_TTL)
+            pipe.execute()
+
+    @staticmethod
+    def _decode_cart(raw: dict) -> dict[str, int]:
+        return {(pid.decode() if isinstance(pid, bytes) else pid): int(qty) for pid, qty in raw.items()}
 
     def get_cart(self, user_id: str) -> dict[str, int]:
         key = self._cart_key(user_id)
-        raw = self._r.hgetall(key)
-        return {(pid.decode() if isinstance(pid, bytes) else pid): int(qty) for pid, qty in raw.items()}
+        return self._decode_cart(self._r.hgetall(key))
+
+    def get_carts(self, user_ids: list[str]) -> dict[str, dict[str, int]]:
+        """Fetch many carts with one pipelined round-trip."""
+        with self._r.pipeline(transaction=False) as pipe:
+            for uid in user_ids:
+                pipe.hgetall(self._cart_key(uid))
+            raws = pipe.execute()
+        return {uid: self._decode_cart(raw) for uid, raw in zip(user_ids, raws, strict=True)}
 
     def clear_cart(self, user_id: str) -> None:
         self._r.delete(self._cart_key(user_id))
 
     # ───────────────────────────── rate limit ───────────────────────────
-    def _bucket_key(self, user_id: str, endpoint: str) -> str:
-        window_id = int(time.time()) // RATE_LIMIT_WINDOW
+    def _bucket_key(self, user_id: str, endpoint: str, window: int = RATE_LIMIT_WINDOW) -> str:
+        window_id = int(time.time()) // window
         return f"rl:{user_id}:{endpoint}:{window_id}"
 
+    def set_rate_limit_policy(self, endpoint: str, algorithm: str, limit: int, window: int) -> None:
+        if algorithm not in self._rl_scripts:
+            raise ValueError(f"unknown rate-limit algorithm {algorithm!r}; choose from {sorted(self._rl_scripts)}")
+        self._rl_policies[endpoint] = {"algorithm": algorithm, "limit": limit, "window": window}
+
+    def rate_limit_policy(self, endpoint: str) -> RateLimitPolicy:
+        return self._rl_policies.get(
+            endpoint,
+            {"algorithm": RATE_LIMIT_ALGORITHM, "limit": RATE_LIMIT_REQUESTS, "window": RATE_LIMIT_WINDOW},
+        )
+
+    def rate_limit(self, user_id: str, endpoint: str) -> RateLimitResult:
+        """Check and consume one request against the endpoint's policy in a single atomic Lua call."""
+        policy = self.rate_limit_policy(endpoint)
+        algorithm, limit, window = policy["algorithm"], policy["limit"], policy["window"]
+        if algorithm == "fixed_window":
+            key = self._bucket_key(user_id, endpoint, window)
+        else:
+            key = f"rl:{algorithm}:{user_id}:{endpoint}"
+        args = [limit, window]
+        if algorithm == "sliding_log":
+            args.append(uuid.uuid4().hex)
+        allowed, remaining, retry_ms = self._rl_scripts[algorithm](keys=[key], args=args)
+        return RateLimitResult(bool(allowed), int(remaining), int(retry_ms) / 1000)
+
     def rate_limit_ok(self, user_id: str, endpoint: str) -> bool:
-        key = self._bucket_key(user_id, endpoint)
-        cnt = self._r.incr(key)
-        if cnt == 1:
-            self._r.expire(key, RATE_LIMIT_WINDOW)
-        return cnt <= RATE_LIMIT_REQUESTS
+        return self.rate_limit(user_id, endpoint).allowed
 
     # ──────────────────────── hot products toplist ──────────────────────
     def _hot_key(self, date: datetime.date | None = None) -> str:
@@ -0,0 +1,122 @@
+"""Server-side Lua scripts used by RedisClient.
+
+Every rate-limit script takes KEYS[1] = bucket key, ARGV[1] = limit,
+ARGV[2] = window in seconds, reads the clock with TIME so all app servers
+share one time source, and returns {allowed (0/1), remaining, retry_after_ms}.
+"""
+
+FIXED_WINDOW = """
+local n = redis.call('INCR', KEYS[1])
+if n == 1 then
+  redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local limit = tonumber(ARGV[1])
+if n <= limit then
+  return {1, limit - n, 0}
+end
+return {0, 0, math.max(redis.call('PTTL', KEYS[1]), 0)}
+"""
+
+# one sorted-set entry per accepted request; ARGV[3] is a unique member id
+SLIDING_LOG = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local n = redis.call('ZCARD', KEYS[1])
+if n < limit then
+  redis.call('ZADD', KEYS[1], now, ARGV[3])
+  redis.call('PEXPIRE', KEYS[1], math.ceil(window / 1000))
+  return {1, limit - n - 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] == nil then  -- limit <= 0: nothing was ever let in
+  return {0, 0, math.ceil(window / 1000)}
+end
+return {0, 0, math.ceil((tonumber(oldest[2]) + window - now) / 1000)}
+"""
+
+# previous window's count weighted by how much of it still overlaps the
+# sliding window, plus the current window's count; O(1) memory per bucket
+SLIDING_COUNTER = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local win_id = math.floor(now / window)
+local elapsed = now - win_id * window
+
+local s = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local w, cur, prev = tonumber(s[1]), tonumber(s[2]) or 0, tonumber(s[3]) or 0
+if w == win_id - 1 then
+  prev, cur = cur, 0
+elseif w ~= win_id then
+  prev, cur = 0, 0
+end
+
+local weight = 1 - elapsed / window
+if prev * weight + cur + 1 <= limit then
+  cur = cur + 1
+  redis.call('HSET', KEYS[1], 'w', win_id, 'c', cur, 'p', prev)
+  redis.call('EXPIRE', KEYS[1], 2 * window)
+  return {1, math.floor(limit - prev * weight - cur), 0}
+end
+
+local retry
+if limit <= 0 then
+  -- nothing is ever allowed; report the rest of this window
+  retry = window - elapsed
+elseif cur + 1 > limit then
+  -- full until this window ends; then it becomes the weighted previous window
+  retry = window - elapsed + window * (1 - (limit - 1) / cur)
+elseif prev > 0 then
+  retry = math.max(window * (1 - (limit - 1 - cur) / prev) - elapsed, 0)
+else
+  retry = 0
+end
+return {0, 0, math.ceil(retry * 1000)}
+"""
+
+# ARGV[1] = bucket capacity, refilled linearly to full over ARGV[2] seconds
+TOKEN_BUCKET = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local capacity = tonumber(ARGV[1])
+if capacity <= 0 then  -- never refills: report one window
+  return {0, 0, tonumber(ARGV[2]) * 1000}
+end
+local rate = capacity / (tonumber(ARGV[2]) * 1000)  -- tokens per ms
+
+local s = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(s[1]) or capacity
+local ts = tonumber(s[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+
+local allowed, retry = 0, 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, math.floor(tokens), retry}
+"""
+
+RATE_LIMIT_SCRIPTS = {
+    "fixed_window": FIXED_WINDOW,
+    "sliding_log": SLIDING_LOG,
+    "sliding_counter": SLIDING_COUNTER,
+    "token_bucket": TOKEN_BUCKET,
+}
+
+# delete KEYS[1] only while it still holds our token ARGV[1], so a holder whose
+# lock already expired cannot release the lock a later caller acquired
+RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
@@ -0,0 +1,67 @@
+"""Materialize the top-K co-purchase neighbours of each product as CO_PURCHASED edges."""
+
+import argparse
+from collections.abc import Iterable
+
+from src.config import CO_PURCHASE_TOP_K
+from src.db.neo4j_client import neo4j_client
+from src.services.recommendation_service import products_bought_by
+
+# products per write transaction; each one is a two-hop traversal, so batches stay small
+BATCH_SIZE = 200
+
+# weight = number of (PURCHASED, PURCHASED) path pairs through a shared
+# buyer, i.e. exactly the COUNT(*) the live also-bought traversal computes.
+# The product's old neighbours are dropped first, so a product whose
+# co-purchases disappeared ends up with none; co_purchased_k marks it as
+# materialized (and up to which limit) either way.
+REFRESH_CYPHER = """
+UNWIND $rows AS row
+MATCH (p:Product {id: row.pid})
+OPTIONAL MATCH (p)-[old:CO_PURCHASED]->()
+DELETE old
+WITH DISTINCT p, row
+OPTIONAL MATCH (p)<-[:PURCHASED]-(:User)-[:PURCHASED]->(other:Product)
+WHERE other <> p
+WITH p, row, other, count(other) AS weight
+ORDER BY weight DESC, other.id
+WITH p, row, collect(CASE WHEN other IS NOT NULL THEN {other: other, weight: weight} END)[..row.k] AS top
+SET p.co_purchased_k = row.k
+WITH p, top
+UNWIND top AS t
+WITH p, t.other AS other, t.weight AS weight
+CREATE (p)-[:CO_PURCHASED {weight: weight}]->(other)
+"""
+
+ALL_PRODUCTS_CYPHER = "MATCH (p:Product) RETURN p.id AS id"
+
+
+def refresh(product_ids: Iterable[int] | None = None, k: int = CO_PURCHASE_TOP_K, batch_size: int = BATCH_SIZE) -> int:
+    """Recompute the CO_PURCHASED lists of ``product_ids`` (all products when None); returns products refreshed."""
+    if product_ids is None:
+        with neo4j_client.driver.session() as s:
+            product_ids = [r["id"] for r in s.run(ALL_PRODUCTS_CYPHER)]
+    totals = neo4j_client.write_batches(REFRESH_CYPHER, ({"pid": pid, "k": k} for pid in product_ids), batch_size)
+    return totals["rows"]
+
+
+def refresh_for_buyers(user_ids: Iterable[int], k: int = CO_PURCHASE_TOP_K) -> list[int]:
+    """
+    Incremental refresh after new purchases by ``user_ids`` have been written.
+    A new PURCHASED edge u->p changes the weight of (p, q) and (q, p) for every
+    product q that u bought, so only those lists are recomputed; their ids are
+    returned.
+    """
+    product_ids = products_bought_by(user_ids)
+    refresh(product_ids, k)
+    return product_ids
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--k", type=int, default=CO_PURCHASE_TOP_K, help="neighbours kept per product")
+    ap.add_argument("--products", type=int, nargs="*", help="refresh only these product ids")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = ap.parse_args()
+    n = refresh(args.products or None, args.k, args.batch_size)
+    print(f"co-purchase lists refreshed for {n} products (k={args.k})")
@@ -1,9 +1,8 @@
 import json
 from pathlib import Path
 
-import pandas as pd
-
 from src.db.mongodb_client import mongo_client
+from src.utils.data_parser import iter_records
 
 
 def project_root(start: Path) -> Path:
@@ -25,21 +24,25 @@ MAP = {
 
 
 def read_records(stem: str):
+    """Yield batches of documents; CSV sources are streamed chunk by chunk."""
     j = DOC / f"{stem}.json"
     if j.exists():
-        return json.loads(j.read_text(encoding="utf8"))
+        yield json.loads(j.read_text(encoding="utf8"))
+        return
     c = DOC / f"{stem}.csv"
     if c.exists():
-        return pd.read_csv(c).to_dict("records")
-    return []
+        yield from iter_records(stem, directory=DOC)
 
 
 def main():
     for coll, stem in MAP.items():
-        docs = read_records(stem)
-        if docs:
-            mongo_client.get_collection(coll).insert_many(docs)
-            print(f"{coll} → {len(docs)} docs")
+        total = 0
+        for docs in read_records(stem):
+            if docs:
+                mongo_client.get_collection(coll).insert_many(docs)
+                total += len(docs)
+        if total:
+            print(f"{coll} → {total} docs")
     print("Mongo load complete")
 
 
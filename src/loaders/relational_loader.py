@@ -1,25 +1,65 @@
 """Load CSV data from raw_data/relational_data into PostgreSQL."""
 
-from pathlib import Path
+import argparse
+import functools
+import io
+import time
+from collections.abc import Iterable, Iterator, Sequence
 
 import pandas as pd
+from psycopg2 import sql
 
 from src.db.postgres_client import db
+from src.utils.data_parser import RAW_DIR, iter_csv
 
-DATA_DIR = Path(__file__).resolve().parents[2] / "raw_data" / "relational_data"
+DATA_DIR = RAW_DIR
+
+TABLES = ("categories", "users", "sellers", "products", "orders", "order_items", "product_embeddings")
+COPY_CHUNK_ROWS = 50_000  # rows serialised into one in-memory CSV buffer per COPY call
 
 
 def _num(code: str) -> int:
     return int("".join(c for c in str(code) if c.isdigit()))
 
 
+def _report(fn):
+    """Print rows sent and rows/sec for a ``load_*`` method."""
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        self._rows = 0
+        start = time.perf_counter()
+        result = fn(self, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        rate = self._rows / elapsed if elapsed else 0.0
+        self.report[fn.__name__] = {"rows": self._rows, "seconds": elapsed, "rows_per_sec": rate}
+        print(f"{fn.__name__}: {self._rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+        return result
+
+    return wrapper
+
+
 class RelationalLoader:
-    def __init__(self) -> None:
+    """
+    ``copy_tables`` names the tables ingested with COPY FROM STDIN into a
+    temporary staging table followed by ``INSERT … SELECT … ON CONFLICT``;
+    every other table goes through ``executemany``. Both paths keep the same
+    idempotent conflict handling.
+    """
+
+    def __init__(self, copy_tables: Iterable[str] = ()) -> None:
         self.cur = db.get_cursor
+        self.copy_tables = set(copy_tables)
+        unknown = self.copy_tables - set(TABLES)
+        if unknown:
+            raise ValueError(f"unknown tables for COPY mode: {sorted(unknown)}")
+        self.report: dict[str, dict[str, float]] = {}
+        self._rows = 0
 
     @staticmethod
-    def _csv(stem: str) -> pd.DataFrame:
-        return pd.read_csv(DATA_DIR / f"{stem}.csv")
+    def _csv(stem: str, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        """Stream a CSV in bounded chunks; each ``load_*`` works chunk by chunk."""
+        return iter_csv(stem, columns, directory=DATA_DIR)
 
     def _bulk(self, sql: str, rows: list[dict]) -> None:
         if not rows:
@@ -27,117 +67,125 @@ class RelationalLoader:
         with self.cur() as cur:
             cur.executemany(sql, rows)
 
+    def _ingest(self, table: str, df: pd.DataFrame, conflict: str = "") -> None:
+        """Insert every column of ``df`` into ``table`` with ``ON CONFLICT {conflict} DO NOTHING``."""
+        if df.empty:
+            return
+        if table in self.copy_tables:
+            self._copy(table, df, conflict)
+        else:
+            cols = ", ".join(df.columns)
+            vals = ", ".join(f"%({c})s" for c in df.columns)
+            self._bulk(
+                f"INSERT INTO {table} ({cols}) VALUES ({vals}) ON CONFLICT {conflict} DO NOTHING",
+                df.to_dict("records"),
+            )
+        self._rows += len(df)
+
+    def _copy(self, table: str, df: pd.DataFrame, conflict: str) -> None:
+        stage = sql.Identifier(f"_stage_{table}")
+        cols = sql.SQL(", ").join(map(sql.Identifier, df.columns))
+        with self.cur() as cur:
+            cur.execute(
+                sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                    stage, cols, sql.Identifier(table)
+                )
+            )
+            copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(stage, cols)
+            for start in range(0, len(df), COPY_CHUNK_ROWS):
+                buf = io.StringIO()
+                df.iloc[start : start + COPY_CHUNK_ROWS].to_csv(buf, index=False, header=False)
+                buf.seek(0)
+                cur.copy_expert(copy_sql, buf)
+            cur.execute(
+                sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT {} DO NOTHING").format(
+                    sql.Identifier(table), cols, cols, stage, sql.SQL(conflict)
+                )
+            )
+
     # ───────────────────────── tables ─────────────────────────
 
+    @_report
     def load_categories(self) -> None:
-        df = self._csv("categories")
-        rows = df[["name", "description"]].to_dict("records")
-        self._bulk(
-            "INSERT INTO categories (name, description) "
-            "VALUES (%(name)s, %(description)s) "
-            "ON CONFLICT (name) DO NOTHING",
-            rows,
-        )
+        for df in self._csv("categories", ["name", "description"]):
+            self._ingest("categories", df, "(name)")
 
+    @_report
     def load_users(self) -> None:
-        df = self._csv("users")
-        rows = df.rename(columns={"name": "full_name"})[["email", "full_name", "join_date"]].to_dict("records")
-        self._bulk(
-            "INSERT INTO users (email, full_name, join_date) "
-            "VALUES (%(email)s, %(full_name)s, %(join_date)s) "
-            "ON CONFLICT (email) DO NOTHING",
-            rows,
-        )
+        for df in self._csv("users", ["email", "name", "join_date"]):
+            self._ingest(
+                "users", df.rename(columns={"name": "full_name"})[["email", "full_name", "join_date"]], "(email)"
+            )
 
+    @_report
     def load_sellers(self) -> None:
-        df = self._csv("sellers")
-        df["email"] = df["id"].str.lower() + "@seller.local"
-        user_rows = df.rename(columns={"name": "full_name", "joined": "join_date"})[
-            ["email", "full_name", "join_date"]
-        ].to_dict("records")
-        self._bulk(
-            "INSERT INTO users (email, full_name, join_date) "
-            "VALUES (%(email)s, %(full_name)s, %(join_date)s) "
-            "ON CONFLICT (email) DO NOTHING",
-            user_rows,
-        )
+        for df in self._csv("sellers", ["id", "name", "rating", "joined"]):
+            df["email"] = df["id"].str.lower() + "@seller.local"
+            self._ingest(
+                "users",
+                df.rename(columns={"name": "full_name", "joined": "join_date"})[["email", "full_name", "join_date"]],
+                "(email)",
+            )
+            with self.cur() as cur:
+                cur.execute("SELECT id, email FROM users WHERE email = ANY(%s)", (df["email"].tolist(),))
+                email_uid = {r["email"]: r["id"] for r in cur.fetchall()}
+            seller_df = pd.DataFrame({"user_id": df["email"].map(email_uid), "rating": df["rating"]})
+            self._ingest("sellers", seller_df, "(user_id)")
+
+    def _category_ids(self) -> dict[str, int]:
         with self.cur() as cur:
-            cur.execute("SELECT id, email FROM users WHERE email LIKE '%@seller.local'")
-            email_uid = {r["email"]: r["id"] for r in cur.fetchall()}
-        seller_rows = [{"user_id": email_uid[r["email"]], "rating": r["rating"]} for r in df.to_dict("records")]
-        self._bulk(
-            "INSERT INTO sellers (user_id, rating) VALUES (%(user_id)s, %(rating)s) ON CONFLICT (user_id) DO NOTHING",
-            seller_rows,
-        )
+            cur.execute("SELECT id, name FROM categories")
+            return {r["name"]: r["id"] for r in cur.fetchall()}
 
+    @_report
     def load_products(self) -> None:
-        df = self._csv("products")
-        self._bulk(
-            "INSERT INTO categories (name) VALUES (%(name)s) ON CONFLICT (name) DO NOTHING",
-            df[["category"]].drop_duplicates().rename(columns={"category": "name"}).to_dict("records"),
-        )
+        cat_map = self._category_ids()
         with self.cur() as cur:
-            cur.execute("SELECT id, name FROM categories")
-            cat_map = {r["name"]: r["id"] for r in cur.fetchall()}
             cur.execute("SELECT s.id, u.email FROM sellers s JOIN users u ON u.id = s.user_id")
             seller_map = {r["email"].split("@")[0].upper(): r["id"] for r in cur.fetchall()}
-        rows = [
-            {
-                "category_id": cat_map[r["category"]],
-                "seller_id": seller_map[r["seller_id"]],
-                "name": r["name"],
-                "description": r["description"],
-                "price_cents": int(float(r["price"]) * 100),
-            }
-            for _, r in df.iterrows()
-        ]
-        self._bulk(
-            "INSERT INTO products "
-            "(category_id, seller_id, name, description, price_cents) "
-            "VALUES "
-            "(%(category_id)s, %(seller_id)s, %(name)s, %(description)s, %(price_cents)s) "
-            "ON CONFLICT (name) DO NOTHING",
-            rows,
-        )
-
+        for df in self._csv("products", ["category", "seller_id", "name", "description", "price"]):
+            new_cats = sorted(set(df["category"]) - cat_map.keys())
+            if new_cats:
+                self._ingest("categories", pd.DataFrame({"name": new_cats}), "(name)")
+                cat_map = self._category_ids()
+            rows = pd.DataFrame(
+                {
+                    "category_id": df["category"].map(cat_map),
+                    "seller_id": df["seller_id"].map(seller_map),
+                    "name": df["name"],
+                    "description": df["description"],
+                    "price_cents": (df["price"] * 100).astype(int),
+                }
+            )
+            # map() leaves NaN for unknown keys, which would turn the FK columns into floats
+            unmapped = rows[["category_id", "seller_id"]].isna().any(axis=1)
+            if unmapped.any():
+                bad = df.loc[unmapped, ["category", "seller_id"]].drop_duplicates().values.tolist()
+                raise KeyError(f"products reference unknown (category, seller_id): {bad}")
+            rows = rows.astype({"category_id": int, "seller_id": int})
+            self._ingest("products", rows, "(name)")
+
+    @_report
     def load_orders(self) -> None:
-        df = self._csv("orders")
-        df["id"] = df["id"].map(_num)
-        df["user_id"] = df["user_id"].map(_num)
-        rows = df.to_dict("records")
-        self._bulk(
-            "INSERT INTO orders (id, user_id, created_at) "
-            "VALUES (%(id)s, %(user_id)s, %(created_at)s) "
-            "ON CONFLICT (id) DO NOTHING",
-            rows,
-        )
+        for df in self._csv("orders", ["id", "user_id", "created_at"]):
+            df["id"] = df["id"].map(_num)
+            df["user_id"] = df["user_id"].map(_num)
+            self._ingest("orders", df, "(id)")
 
+    @_report
     def load_order_items(self) -> None:
-        df = self._csv("order_items")
-        df["order_id"] = df["order_id"].map(_num)
-        df["product_id"] = df["product_id"].map(_num)
-        df.rename(columns={"price": "price_cents"}, inplace=True)
-        df["price_cents"] = (df["price_cents"] * 100).astype(int)
-        rows = df.to_dict("records")
-        self._bulk(
-            "INSERT INTO order_items "
-            "(order_id, product_id, quantity, price_cents) "
-            "VALUES "
-            "(%(order_id)s, %(product_id)s, %(quantity)s, %(price_cents)s) "
-            "ON CONFLICT DO NOTHING",
-            rows,
-        )
-
+        for df in self._csv("order_items", ["order_id", "product_id", "quantity", "price"]):
+            df["order_id"] = df["order_id"].map(_num)
+            df["product_id"] = df["product_id"].map(_num)
+            df.rename(columns={"price": "price_cents"}, inplace=True)
+            df["price_cents"] = (df["price_cents"] * 100).astype(int)
+            self._ingest("order_items", df)
+
+    @_report
     def load_product_embeddings(self) -> None:
-        df = self._csv("product_embeddings")
-        df["product_id"] = df["product_id"].map(_num)
-        rows = [{"product_id": r["product_id"], "embedding": r["embedding"]} for r in df.to_dict("records")]
-        self._bulk(
-            "INSERT INTO product_embeddings (product_id, embedding) "
-            "VALUES (%(product_id)s, %(embedding)s::vector) "
-            "ON CONFLICT (product_id) DO NOTHING",
-            rows,
-        )
+        for df in self._csv("product_embeddings", ["product_id", "embedding"]):
+            df["product_id"] = df["product_id"].map(_num)
+            self._ingest("product_embeddings", df, "(product_id)")
 
     # ───────────────────────── entrypoint ─────────────────────────
 
@@ -153,4 +201,13 @@ class RelationalLoader:
 
 
 if __name__ == "__main__":
-    RelationalLoader().run()
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument(
+        "--copy",
+        nargs="+",
+        default=[],
+        metavar="TABLE",
+        help=f"tables to ingest with COPY instead of executemany ('all' or any of: {', '.join(TABLES)})",
+    )
+    args = ap.parse_args()
+    RelationalLoader(copy_tables=TABLES if args.copy == ["all"] else args.copy).run()
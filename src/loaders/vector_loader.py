@@ -1,48 +1,75 @@
 """Create/refresh 384-dim pgvector embeddings for every product description."""
 
+import argparse
+from hashlib import sha1
 from pathlib import Path
 
-import pandas as pd
-import psycopg2
-from sentence_transformers import SentenceTransformer
+from psycopg2.extras import execute_values
 
-from src.config import POSTGRES_CONFIG
+from src.config import EMBED_BATCH_SIZE
+from src.db.postgres_client import db
+from src.utils.data_parser import iter_csv
+from src.utils.embedding_model import get_model
 
 ROOT = Path(__file__).resolve().parents[2]
 REL = ROOT / "raw_data" / "relational_data" / "products.csv"
 
-MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-
 
 def product_id(code: str) -> int:
     """Convert 'P015' -> 15."""
     return int("".join(c for c in code if c.isdigit()))
 
 
-def main() -> None:
-    df = pd.read_csv(REL)[["id", "description"]]
-    texts = df["description"].fillna("").tolist()
-    embeds = MODEL.encode(texts, normalize_embeddings=True)
+def text_hash(text: str) -> str:
+    return sha1(text.encode("utf8")).hexdigest()
+
+
+def main(incremental: bool = True, batch_size: int = EMBED_BATCH_SIZE) -> dict[str, int]:
+    """
+    Embed product descriptions and upsert them into ``product_embeddings``.
 
+    In incremental mode a product is re-encoded only when the sha1 of its
+    description differs from the stored ``content_hash``.
+    """
     sql = """
-        INSERT INTO product_embeddings(product_id, embedding)
-        VALUES (%s, %s::vector)
+        INSERT INTO product_embeddings(product_id, embedding, content_hash)
+        VALUES %s
         ON CONFLICT (product_id)
-        DO UPDATE SET embedding = EXCLUDED.embedding
+        DO UPDATE SET embedding = EXCLUDED.embedding, content_hash = EXCLUDED.content_hash
     """
+    stats = {"encoded": 0, "skipped": 0}
+
+    for df in iter_csv(REL.stem, ["id", "description"], directory=REL.parent):
+        df["pid"] = df["id"].map(product_id)  # id is e.g. 'P015'
+        df["text"] = df["description"].fillna("")
+        df["hash"] = df["text"].map(text_hash)
 
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    cur = conn.cursor()
+        if incremental:
+            with db.get_cursor() as cur:
+                cur.execute(
+                    "SELECT product_id, content_hash FROM product_embeddings WHERE product_id = ANY(%s)",
+                    (df["pid"].tolist(),),
+                )
+                stored = {r["product_id"]: r["content_hash"] for r in cur.fetchall()}
+            changed = df["hash"] != df["pid"].map(stored)
+            stats["skipped"] += int((~changed).sum())
+            df = df[changed]
 
-    for row, vec in zip(df.itertuples(index=False), embeds, strict=False):
-        pid = product_id(row.id)  # row.id is e.g. 'P015'
-        cur.execute(sql, (pid, vec.tolist()))
+        if df.empty:
+            continue
+        embeds = get_model().encode(df["text"].tolist(), batch_size=batch_size, normalize_embeddings=True)
+        rows = [(pid, vec.tolist(), h) for pid, vec, h in zip(df["pid"], embeds, df["hash"], strict=True)]
+        with db.get_cursor() as cur:
+            execute_values(cur, sql, rows, template="(%s, %s::vector, %s)", page_size=500)
+        stats["encoded"] += len(rows)
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    print("vector load complete")
+    print(f"vector load complete: {stats['encoded']} encoded, {stats['skipped']} unchanged")
+    return stats
 
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--full", action="store_true", help="re-encode every product, ignoring stored hashes")
+    ap.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = ap.parse_args()
+    main(incremental=not args.full, batch_size=args.batch_size)
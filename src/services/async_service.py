@@ -0,0 +1,512 @@
+"""
+asyncio facade over the marketplace services.
+
+Same operations, keys and return shapes as the synchronous services, but on
+asyncpg, ``redis.asyncio``, the Neo4j async driver and pymongo's
+``AsyncMongoClient`` so one event loop can keep many requests in flight.
+Connections belong to the loop they were opened in; create one
+:class:`AsyncMarketService` per loop and close it (or use it as an async
+context manager)::
+
+    async with AsyncMarketService() as market:
+        rows = await market.search("wooden bowl")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import asyncpg
+from neo4j import AsyncGraphDatabase, Query
+from neo4j.exceptions import ClientError, TransientError
+from pymongo import AsyncMongoClient
+
+from src.config import (
+    CACHE_TTL,
+    MONGO_CONFIG,
+    NEO4J_CONFIG,
+    NEO4J_MAX_RETRY_TIME,
+    PERSONALIZED_BUDGET,
+    PERSONALIZED_HALF_LIFE_DAYS,
+    PERSONALIZED_MAX_BUYERS,
+    PERSONALIZED_MAX_ITEMS,
+    PERSONALIZED_MAX_SEEDS,
+    PG_POOL_MAX_SIZE,
+    PG_POOL_MIN_SIZE,
+    POSTGRES_CONFIG,
+    PRODUCT_PAGE_TIMEOUT,
+    PRODUCT_PAGE_TIMEOUTS,
+    PRODUCT_PAGE_TTLS,
+    RECO_CACHE_TTL,
+    RECO_FALLBACK_TTL,
+    SEARCH_LOCK_TTL,
+    SEARCH_LOCK_WAIT,
+    SEARCH_STALE_TTL,
+)
+from src.db.async_redis_client import AsyncRedisClient
+from src.services.order_service import _quantities
+from src.services.product_page_service import RELATED_LIMIT, REVIEWS_LIMIT, SECTIONS, _section_key, product_code
+from src.services.recommendation_service import (
+    ALSO_BOUGHT_CYPHER,
+    BOUGHT_BY_CYPHER,
+    CO_PURCHASED_CYPHER,
+    FREQUENTLY_BOUGHT_TOGETHER_CYPHER,
+    PERSONALIZED_BOUNDED_CYPHER,
+    PERSONALIZED_CYPHER,
+    PERSONALIZED_FALLBACK_CYPHER,
+    bounded_request,
+    co_purchased_rows,
+    is_timeout,
+)
+from src.services.search_service import PRICE_RANGES_KEY, ProductSearchService
+from src.services.vector_search_service import query_cache
+
+_log = logging.getLogger(__name__)
+
+SIMILAR_BY_TEXT_SQL = """
+    SELECT p.id, p.name, p.price_cents, 1 - (e.embedding <#> $1::text::vector) AS score
+    FROM product_embeddings e
+    JOIN products p ON p.id = e.product_id
+    ORDER BY e.embedding <#> $1::text::vector
+    LIMIT $2
+"""
+
+SIMILAR_TO_PRODUCT_SQL = """
+    WITH src AS (SELECT embedding FROM product_embeddings WHERE product_id = $1)
+    SELECT p.id, p.name, p.price_cents, 1 - (e.embedding <#> src.embedding) AS score
+    FROM product_embeddings e
+    JOIN products p ON p.id = e.product_id
+    CROSS JOIN src
+    WHERE e.product_id <> $1
+    ORDER BY e.embedding <#> src.embedding
+    LIMIT $2
+"""
+
+PRODUCT_SQL = """
+    SELECT p.id, p.name, p.description, p.price_cents, p.category_id, c.name AS category, p.seller_id
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.id = $1
+"""
+
+# asyncpg spellings of the statements in order_service
+ALLOCATE_IDS_SQL = "SELECT nextval(pg_get_serial_sequence('orders', 'id')) FROM generate_series(1, $1)"
+INSERT_ORDERS_SQL = "INSERT INTO orders(id, user_id) SELECT * FROM unnest($1::int[], $2::int[])"
+INSERT_ITEMS_SQL = """
+    WITH wanted AS (
+        SELECT * FROM unnest($1::int[], $2::int[], $3::int[]) AS w(order_id, product_id, quantity)
+    ), priced AS (
+        SELECT id, price_cents FROM products WHERE id = ANY($2::int[]) ORDER BY id FOR SHARE
+    )
+    INSERT INTO order_items(order_id, product_id, quantity, price_cents)
+    SELECT w.order_id, w.product_id, w.quantity, p.price_cents
+    FROM wanted w
+    JOIN priced p ON p.id = w.product_id
+    RETURNING product_id
+"""
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        _log.warning("background call failed", exc_info=task.exception())
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # read real (e.g. ts_rank_cd) as text like psycopg2 does, so both clients
+    # produce the same floats (1.4, not 1.399999976) and share cache entries
+    await conn.set_type_codec("float4", schema="pg_catalog", encoder=str, decoder=float, format="text")
+
+
+class AsyncMarketService:
+    def __init__(self, pg_min_size: int = PG_POOL_MIN_SIZE, pg_max_size: int = PG_POOL_MAX_SIZE) -> None:
+        self._pg_sizes = (pg_min_size, pg_max_size)
+        self._pg: asyncpg.Pool | None = None
+        self._pg_lock = asyncio.Lock()
+        self._neo4j = None
+        self._mongo = None
+        self.redis = AsyncRedisClient()
+        # concurrent misses on one search key share a single query
+        self._inflight: dict[str, asyncio.Future] = {}
+        # fire-and-forget work (view counters, late page sections); held so it is not collected mid-flight
+        self._background: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> AsyncMarketService:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*self._background, return_exceptions=True)
+        if self._pg is not None:
+            await self._pg.close()
+        if self._neo4j is not None:
+            await self._neo4j.close()
+        if self._mongo is not None:
+            await self._mongo.close()
+        await self.redis.aclose()
+
+    # ─────────────────────────── connections ───────────────────────────
+    async def pg(self) -> asyncpg.Pool:
+        if self._pg is None:
+            async with self._pg_lock:
+                if self._pg is None:
+                    self._pg = await asyncpg.create_pool(
+                        host=POSTGRES_CONFIG["host"],
+                        port=POSTGRES_CONFIG["port"],
+                        database=POSTGRES_CONFIG["database"],
+                        user=POSTGRES_CONFIG["user"],
+                        password=POSTGRES_CONFIG["password"],
+                        min_size=self._pg_sizes[0],
+                        max_size=self._pg_sizes[1],
+                        init=_init_connection,
+                    )
+        return self._pg
+
+    @property
+    def neo4j(self):
+        if self._neo4j is None:
+            self._neo4j = AsyncGraphDatabase.driver(
+                NEO4J_CONFIG["uri"],
+                auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]),
+                max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
+            )
+        return self._neo4j
+
+    @property
+    def mongo(self):
+        if self._mongo is None:
+            self._mongo = AsyncMongoClient(MONGO_CONFIG["uri"], serverSelectionTimeoutMS=5000)
+        return self._mongo[MONGO_CONFIG["database"]]
+
+    async def _fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        pool = await self.pg()
+        return [dict(r) for r in await pool.fetch(query, *args)]
+
+    # ────────────────────────────── search ──────────────────────────────
+    async def search(
+        self,
+        query: str,
+        category: int | None = None,
+        price_range: tuple[int, int] | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """
+        :meth:`ProductSearchService.search` on the same cache entries, with
+        the same Redis lock and XFetch early refresh, so sync and async
+        processes recompute a key once between them. Within this event loop
+        callers of a key being recomputed wait for it (or get the stale rows)
+        instead of each polling Redis.
+        """
+        cache_key = ProductSearchService._make_key(
+            ProductSearchService.canonical_query(query), category, price_range, limit
+        )
+        entry = ProductSearchService._unwrap(await self.redis.get_json(cache_key))
+        if entry is not None:
+            now = time.time()
+            if not ProductSearchService._should_refresh(entry, now) or cache_key in self._inflight:
+                await self._count("hits", "stale" if now >= entry["expires"] else None)
+                return entry["rows"]
+        else:
+            pending = self._inflight.get(cache_key)
+            if pending is not None:
+                await self._count("coalesced")
+                return await asyncio.shield(pending)
+        return await self._single_flight(
+            cache_key, lambda: self._search_fill(cache_key, entry, query, category, price_range, limit)
+        )
+
+    async def _count(self, *names: str | None) -> None:
+        async with self.redis.client.pipeline(transaction=False) as pipe:
+            for name in filter(None, names):
+                pipe.incr(f"stats:search:{name}")
+            await pipe.execute()
+
+    async def _single_flight(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``compute`` while publishing its future under ``key`` for callers that arrive meanwhile."""
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await compute()
+            fut.set_result(result)
+            return result
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved so a lone caller does not log "never retrieved"
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _search_fill(
+        self,
+        cache_key: str,
+        entry: dict[str, Any] | None,
+        q: str,
+        cat: int | None,
+        pr: tuple[int, int] | None,
+        lim: int,
+    ) -> list[dict[str, Any]]:
+        """Refresh ``entry`` (or fill its missing key) when this process wins the lock, like ``_cached``."""
+        now = time.time()
+        token = await self.redis.acquire_lock(cache_key, SEARCH_LOCK_TTL)
+        if entry is not None:
+            if token is None:  # another process is refreshing
+                await self._count("hits", "stale" if now >= entry["expires"] else None)
+                return entry["rows"]
+            await self._count("early_refresh" if now < entry["expires"] else "miss")
+        else:
+            if token is None:
+                entry = await self._wait_for(cache_key)
+                if entry is not None:
+                    await self._count("coalesced")
+                    return entry["rows"]
+                _log.warning("search cache: gave up waiting for %s, querying directly", cache_key)
+            await self._count("miss")
+
+        try:
+            start = time.perf_counter()
+            rows = await self._run_pg_query(q, cat, pr, lim)
+            ttl = CACHE_TTL + SEARCH_STALE_TTL
+            entry = {"rows": rows, "delta": time.perf_counter() - start, "expires": time.time() + CACHE_TTL}
+            await self.redis.set_json(cache_key, entry, ttl=ttl)
+            if pr:
+                async with self.redis.client.pipeline(transaction=False) as pipe:
+                    pipe.sadd(PRICE_RANGES_KEY, f"{pr[0]}-{pr[1]}")
+                    pipe.expire(PRICE_RANGES_KEY, ttl)
+                    await pipe.execute()
+            await self.redis.tag(cache_key, ProductSearchService._result_tags(rows, cat, pr), ttl)
+            return rows
+        finally:
+            if token is not None:
+                await self.redis.release_lock(cache_key, token)
+
+    async def _wait_for(self, cache_key: str) -> dict[str, Any] | None:
+        deadline = time.monotonic() + SEARCH_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            entry = ProductSearchService._unwrap(await self.redis.get_json(cache_key))
+            if entry is not None:
+                return entry
+        return None
+
+    async def _run_pg_query(
+        self, q: str, cat: int | None, pr: tuple[int, int] | None, lim: int
+    ) -> list[dict[str, Any]]:
+        sql = (
+            "SELECT id, name, price_cents, ts_rank_cd(search_vector, plainto_tsquery($1)) AS rank "
+            "FROM products WHERE search_vector @@ plainto_tsquery($1)"
+        )
+        args: list[Any] = [q]
+        if cat:
+            args.append(cat)
+            sql += f" AND category_id = ${len(args)}"
+        if pr:
+            args.extend(pr)
+            sql += f" AND price_cents BETWEEN ${len(args) - 1} AND ${len(args)}"
+        args.append(lim)
+        sql += f" ORDER BY rank DESC LIMIT ${len(args)}"
+        return await self._fetch(sql, *args)
+
+    # ───────────────────────────── semantic ─────────────────────────────
+    async def similar_by_text(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        # the embedding is CPU-bound (and usually cached), so it runs off-loop
+        vec = await asyncio.to_thread(query_cache.get, query)
+        return await self._fetch(SIMILAR_BY_TEXT_SQL, str(vec.tolist()), limit)
+
+    async def similar_to_product(self, product_id: int, limit: int = 5) -> list[dict[str, Any]]:
+        return await self._fetch(SIMILAR_TO_PRODUCT_SQL, product_id, limit)
+
+    # ────────────────────────── recommendations ─────────────────────────
+    async def _cypher(self, query: str | Query, **params: Any) -> list[dict[str, Any]]:
+        async with self.neo4j.session() as s:
+            result = await s.run(query, **params)
+            return [dict(r) async for r in result]
+
+    async def also_bought(self, product_id: int, limit: int = 5) -> list[dict[str, Any]]:
+        async def compute() -> tuple[list[dict[str, Any]], list[int], int]:
+            return await self._co_purchased(ALSO_BOUGHT_CYPHER, product_id, limit, "freq"), [product_id], RECO_CACHE_TTL
+
+        return await self._reco_cached(f"reco:also_bought:{product_id}:{limit}", compute)
+
+    async def frequently_bought_together(self, product_id: int, limit: int = 5) -> list[dict[str, Any]]:
+        async def compute() -> tuple[list[dict[str, Any]], list[int], int]:
+            rows = await self._co_purchased(FREQUENTLY_BOUGHT_TOGETHER_CYPHER, product_id, limit, "together")
+            return rows, [product_id], RECO_CACHE_TTL
+
+        return await self._reco_cached(f"reco:frequently_bought_together:{product_id}:{limit}", compute)
+
+    async def personalized(self, user_id: int, limit: int = 5) -> list[dict[str, Any]]:
+        async def compute() -> tuple[list[dict[str, Any]], list[int], int]:
+            rows = await self._cypher(PERSONALIZED_CYPHER, uid=user_id, lim=limit)
+            owned = await self._cypher(BOUGHT_BY_CYPHER, uids=[user_id])
+            return rows, [r["id"] for r in owned], RECO_CACHE_TTL
+
+        return await self._reco_cached(f"reco:personalized:{user_id}:{limit}", compute, user_id=user_id)
+
+    async def personalized_bounded(
+        self,
+        user_id: int,
+        limit: int = 5,
+        *,
+        max_seeds: int = PERSONALIZED_MAX_SEEDS,
+        max_buyers: int = PERSONALIZED_MAX_BUYERS,
+        max_items: int = PERSONALIZED_MAX_ITEMS,
+        half_life_days: float = PERSONALIZED_HALF_LIFE_DAYS,
+        budget: float = PERSONALIZED_BUDGET,
+    ) -> list[dict[str, Any]]:
+        key, params = bounded_request(user_id, limit, max_seeds, max_buyers, max_items, half_life_days)
+
+        async def compute() -> tuple[list[dict[str, Any]], list[int], int]:
+            query = Query(PERSONALIZED_BOUNDED_CYPHER, timeout=budget)
+            ttl = RECO_CACHE_TTL
+            try:
+                rows = await self._cypher(query, **params, today=datetime.date.today().isoformat())
+            except (ClientError, TransientError) as exc:
+                if not is_timeout(exc):
+                    raise
+                _log.warning("personalized for user %s exceeded %.2fs, using co-purchase lists", user_id, budget)
+                rows, ttl = await self._cypher(PERSONALIZED_FALLBACK_CYPHER, **params), RECO_FALLBACK_TTL
+            owned = await self._cypher(BOUGHT_BY_CYPHER, uids=[user_id])
+            return rows, [r["id"] for r in owned], ttl
+
+        return await self._reco_cached(key, compute, user_id=user_id)
+
+    async def invalidate_purchases(self, user_ids: Iterable[int], product_ids: Iterable[int] | None = None) -> int:
+        """:meth:`RecommendationService.invalidate_purchases` on the event loop: same tags."""
+        user_ids = sorted(set(user_ids))
+        if product_ids is None:
+            product_ids = [r["id"] for r in await self._cypher(BOUGHT_BY_CYPHER, uids=user_ids)]
+        tags = [*(f"reco:user:{u}" for u in user_ids), *(f"reco:product:{p}" for p in product_ids)]
+        return await self.redis.invalidate_tags(*tags)
+
+    async def _reco_cached(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[tuple[list[dict[str, Any]], list[int], int]]],
+        user_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Same keys, tags and stats as ``RecommendationService._cached``."""
+        rows = await self.redis.get_json(key)
+        if rows is not None:
+            await self.redis.client.incr("stats:reco:hits")
+            return rows
+        await self.redis.client.incr("stats:reco:miss")
+        rows, product_ids, ttl = await compute()
+        await self.redis.set_json(key, rows, ttl=ttl)
+        tags = [f"reco:product:{p}" for p in product_ids]
+        if user_id is not None:
+            tags.append(f"reco:user:{user_id}")
+        await self.redis.tag(key, tags, ttl)
+        return rows
+
+    async def _co_purchased(self, fallback: str, product_id: int, limit: int, field: str) -> list[dict[str, Any]]:
+        records = await self._cypher(CO_PURCHASED_CYPHER, pid=product_id)
+        rows = co_purchased_rows(records[0] if records else None, limit, field)
+        if rows is None:
+            rows = await self._cypher(fallback, pid=product_id, lim=limit)
+        return rows
+
+    # ───────────────────────────── documents ────────────────────────────
+    async def product_specs(self, product_code: str) -> dict[str, Any] | None:
+        return await self.mongo.product_specs.find_one({"product_id": product_code}, {"_id": 0})
+
+    async def reviews(self, product_code: str, limit: int = 10) -> list[dict[str, Any]]:
+        cursor = self.mongo.reviews.find({"product_id": product_code}, {"_id": 0})
+        return await cursor.sort([("helpful_votes", -1)]).limit(limit).to_list()
+
+    # ──────────────────────────── product page ──────────────────────────
+    async def product_page(self, product_id: int, timeouts: dict[str, float] | None = None) -> dict[str, Any] | None:
+        """:func:`product_page_service.get_product_page` on the event loop: same sections, keys and timeouts."""
+        timeouts = {**PRODUCT_PAGE_TIMEOUTS, **(timeouts or {})}
+        self._spawn(self.redis.record_view(product_code(product_id))).add_done_callback(_log_failure)
+
+        keys = {section: _section_key(section, product_id) for section in SECTIONS}
+        cached = await self.redis.get_many_json(keys.values())
+        page: dict[str, Any] = {section: cached[key] for section, key in keys.items() if key in cached}
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = {s: self._spawn(self._load_section(s, product_id)) for s in SECTIONS if s not in page}
+        missing = []
+        for section, task in tasks.items():
+            budget = start + timeouts.get(section, PRODUCT_PAGE_TIMEOUT) - loop.time()
+            try:
+                # shielded: a section that misses its deadline still lands in the cache
+                page[section] = await asyncio.wait_for(asyncio.shield(task), max(0.0, budget))
+            except TimeoutError:
+                task.add_done_callback(_log_failure)
+                page[section] = None
+                missing.append(section)
+            except Exception:
+                _log.warning("product page %s: %s section failed", product_id, section, exc_info=True)
+                page[section] = None
+                missing.append(section)
+
+        if page["product"] is None and "product" not in missing:
+            return None
+        return {**{section: page[section] for section in SECTIONS}, "missing": missing}
+
+    async def _load_section(self, section: str, product_id: int) -> Any:
+        code = product_code(product_id)
+        if section == "product":
+            rows = await self._fetch(PRODUCT_SQL, product_id)
+            value = rows[0] if rows else None
+        elif section == "specs":
+            value = await self.product_specs(code)
+        elif section == "reviews":
+            value = await self.reviews(code, REVIEWS_LIMIT)
+        elif section == "also_bought":
+            value = await self.also_bought(product_id, RELATED_LIMIT)
+        else:
+            value = await self.similar_to_product(product_id, RELATED_LIMIT)
+        if value is not None:
+            await self.redis.set_json(_section_key(section, product_id), value, ttl=PRODUCT_PAGE_TTLS[section])
+        return value
+
+    def _spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    # ────────────────────────────── orders ──────────────────────────────
+    async def create_order(self, user_id: int, items: list[dict]) -> int:
+        return (await self.create_orders([{"user_id": user_id, "items": items}]))[0]
+
+    async def create_orders(self, batch: list[dict]) -> list[int]:
+        """
+        :func:`order_service.create_orders` on asyncpg: one transaction, three
+        statements. Once committed, cached recommendations the purchases can
+        change are evicted (see :meth:`invalidate_purchases`); a failure there
+        is logged, not raised, since the orders already exist.
+        """
+        if not batch:
+            return []
+        lines = [_quantities(order["items"]) for order in batch]
+        pool = await self.pg()
+        async with pool.acquire() as conn, conn.transaction():
+            order_ids = [r[0] for r in await conn.fetch(ALLOCATE_IDS_SQL, len(batch))]
+            await conn.execute(INSERT_ORDERS_SQL, order_ids, [order["user_id"] for order in batch])
+            oids, pids, qtys = [], [], []
+            for order_id, quantities in zip(order_ids, lines, strict=True):
+                for product_id, qty in quantities.items():
+                    oids.append(order_id)
+                    pids.append(product_id)
+                    qtys.append(qty)
+            inserted = [r[0] for r in await conn.fetch(INSERT_ITEMS_SQL, oids, pids, qtys)]
+            if len(inserted) != len(pids):
+                raise ValueError(f"unknown product ids: {sorted(set(pids) - set(inserted))}")
+
+        users = sorted({order["user_id"] for order in batch})
+        try:
+            # the graph does not hold these purchases yet: add them to what the buyers owned before
+            owned = [r["id"] for r in await self._cypher(BOUGHT_BY_CYPHER, uids=users)]
+            await self.invalidate_purchases(users, {*owned, *pids})
+        except Exception:
+            _log.warning("orders %s: cached recommendations not invalidated", order_ids, exc_info=True)
+        return order_ids
@@ -0,0 +1,81 @@
+"""Hybrid product search: full-text and semantic hits fused with reciprocal rank fusion."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from src.config import HYBRID_CANDIDATES, HYBRID_RRF_K, HYBRID_WORKERS
+from src.services.search_service import search_service
+from src.services.vector_search_service import similar_by_text
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {"lexical": 1.0, "semantic": 1.0}
+
+# the two legs run side by side; threads start on first use, not at import
+_executor = ThreadPoolExecutor(max_workers=HYBRID_WORKERS, thread_name_prefix="hybrid-search")
+
+
+def _lexical(query: str, limit: int) -> list[dict[str, Any]]:
+    return [{**r, "score": r["rank"]} for r in search_service.search(query, limit=limit)]
+
+
+def _semantic(query: str, limit: int) -> list[dict[str, Any]]:
+    return similar_by_text(query, limit=limit)
+
+
+LEGS: dict[str, Callable[[str, int], list[dict[str, Any]]]] = {"lexical": _lexical, "semantic": _semantic}
+
+
+def rrf_fuse(
+    ranked: Mapping[str, list[dict[str, Any]]],
+    weights: Mapping[str, float] | None = None,
+    k: int = HYBRID_RRF_K,
+) -> list[dict[str, Any]]:
+    """
+    Reciprocal rank fusion: a product scores ``sum(weight / (k + rank))``
+    over the sources that returned it (rank is 1-based). Each hit keeps the
+    rank and native score it had in every source under ``sources``.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    fused: dict[int, dict[str, Any]] = {}
+    for source, rows in ranked.items():
+        weight = weights.get(source, 1.0)
+        for rank, row in enumerate(rows, start=1):
+            hit = fused.setdefault(
+                row["id"],
+                {"id": row["id"], "name": row["name"], "price_cents": row["price_cents"], "score": 0.0, "sources": {}},
+            )
+            hit["score"] += weight / (k + rank)
+            hit["sources"][source] = {"rank": rank, "score": row["score"]}
+    return sorted(fused.values(), key=lambda h: (-h["score"], h["id"]))
+
+
+def hybrid_search(
+    query: str,
+    limit: int = 10,
+    weights: Mapping[str, float] | None = None,
+    candidates: int = HYBRID_CANDIDATES,
+    k: int = HYBRID_RRF_K,
+) -> list[dict[str, Any]]:
+    """
+    Top ``limit`` products for ``query`` by RRF over the full-text and the
+    pgvector results. Both legs run concurrently, each on its own pooled
+    connection, so latency is that of the slower leg. If one leg fails the
+    other's results are returned alone; if both fail the error propagates.
+    """
+    futures = {name: _executor.submit(leg, query, candidates) for name, leg in LEGS.items()}
+    ranked: dict[str, list[dict[str, Any]]] = {}
+    errors: list[Exception] = []
+    for name, fut in futures.items():
+        try:
+            ranked[name] = fut.result()
+        except Exception as exc:
+            _log.warning("hybrid search: %s leg failed for %r", name, query, exc_info=True)
+            errors.append(exc)
+    if not ranked:
+        raise errors[0]
+    return rrf_fuse(ranked, weights, k)[:limit]
@@ -1,7 +1,42 @@
+from collections import Counter
 from contextlib import contextmanager
 
+from sqlalchemy import text
+
 from src.db.postgres_client import db
 
+# ids come from the orders sequence up front so every order in a batch knows
+# its id before any row is written, whatever order INSERT … RETURNING yields
+ALLOCATE_IDS_SQL = text("SELECT nextval(pg_get_serial_sequence('orders', 'id')) FROM generate_series(1, :n)")
+
+INSERT_ORDERS_SQL = text(
+    "INSERT INTO orders(id, user_id) SELECT * FROM unnest(CAST(:ids AS int[]), CAST(:user_ids AS int[]))"
+)
+
+# Prices are read and copied in one statement. The product rows are locked
+# FOR SHARE in id order (so concurrent checkouts cannot deadlock) and stay
+# unchanged until commit; a stock check would take FOR UPDATE here instead.
+INSERT_ITEMS_SQL = text(
+    """
+    WITH wanted AS (
+        SELECT *
+        FROM unnest(CAST(:order_ids AS int[]), CAST(:product_ids AS int[]), CAST(:quantities AS int[]))
+             AS w(order_id, product_id, quantity)
+    ), priced AS (
+        SELECT id, price_cents
+        FROM products
+        WHERE id = ANY(CAST(:product_ids AS int[]))
+        ORDER BY id
+        FOR SHARE
+    )
+    INSERT INTO order_items(order_id, product_id, quantity, price_cents)
+    SELECT w.order_id, w.product_id, w.quantity, p.price_cents
+    FROM wanted w
+    JOIN priced p ON p.id = w.product_id
+    RETURNING product_id
+    """
+)
+
 
 @contextmanager
 def pg_session():
@@ -17,33 +52,48 @@ def pg_session():
         session.close()
 
 
+def _quantities(items: list[dict]) -> Counter:
+    """Sum quantities per product so a product listed twice becomes one line."""
+    totals: Counter = Counter()
+    for it in items:
+        if it["qty"] <= 0:
+            raise ValueError(f"quantity must be positive, got {it['qty']} for product {it['product_id']}")
+        totals[it["product_id"]] += it["qty"]
+    return totals
+
+
 def create_order(user_id: int, items: list[dict]):
     """
     items = [{"product_id": 12, "qty": 2}, …]
     """
+    return create_orders([{"user_id": user_id, "items": items}])[0]
+
+
+def create_orders(batch: list[dict]) -> list[int]:
+    """
+    batch = [{"user_id": 7, "items": [{"product_id": 12, "qty": 2}, …]}, …]
+
+    Writes every order and its line items in one transaction using three
+    statements regardless of batch size, and returns the new order ids in
+    batch order. Unknown product ids raise ValueError and nothing is written.
+    """
+    if not batch:
+        return []
+    lines = [_quantities(order["items"]) for order in batch]
+
     with pg_session() as s:
-        order_id = s.execute(
-            "INSERT INTO orders(user_id) VALUES (:u) RETURNING id",
-            {"u": user_id},
-        ).scalar_one()
-
-        rows = [
-            {
-                "order_id": order_id,
-                "product_id": it["product_id"],
-                "quantity": it["qty"],
-                "price_cents": s.execute(
-                    "SELECT price_cents FROM products WHERE id = :pid",
-                    {"pid": it["product_id"]},
-                ).scalar_one(),
-            }
-            for it in items
-        ]
-        s.execute(
-            """
-            INSERT INTO order_items(order_id, product_id, quantity, price_cents)
-            VALUES (:order_id, :product_id, :quantity, :price_cents)
-            """,
-            rows,
-        )
-    return order_id
+        order_ids = [row[0] for row in s.execute(ALLOCATE_IDS_SQL, {"n": len(batch)})]
+        s.execute(INSERT_ORDERS_SQL, {"ids": order_ids, "user_ids": [order["user_id"] for order in batch]})
+
+        params = {"order_ids": [], "product_ids": [], "quantities": []}
+        for order_id, qtys in zip(order_ids, lines, strict=True):
+            for product_id, qty in qtys.items():
+                params["order_ids"].append(order_id)
+                params["product_ids"].append(product_id)
+                params["quantities"].append(qty)
+        inserted = s.execute(INSERT_ITEMS_SQL, params).scalars().all()
+
+        if len(inserted) != len(params["product_ids"]):
+            missing = sorted(set(params["product_ids"]) - set(inserted))
+            raise ValueError(f"unknown product ids: {missing}")
+    return order_ids
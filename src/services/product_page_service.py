@@ -0,0 +1,175 @@
+"""
+Product page: every section the page renders, fetched from the four stores
+concurrently and cached per section.
+
+Sections already in Redis are served from one batched read; the rest run
+side by side on a thread pool, so a cold page costs the slowest store rather
+than the sum. A section that misses its deadline is left out of the response
+(listed under ``missing``): if it has not started yet it is cancelled, and if
+it is already running it finishes and caches itself, so the next view of the
+page is complete. Each section has at most ``PRODUCT_PAGE_MAX_INFLIGHT``
+loads queued or running, so a hung store cannot fill the pool with work
+nobody waits for.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any
+
+from src.config import (
+    PRODUCT_PAGE_MAX_INFLIGHT,
+    PRODUCT_PAGE_TIMEOUT,
+    PRODUCT_PAGE_TIMEOUTS,
+    PRODUCT_PAGE_TTLS,
+    PRODUCT_PAGE_WORKERS,
+)
+from src.db.postgres_client import db
+from src.db.redis_client import redis_client
+from src.services.recommendation_service import recommendation_service
+from src.services.vector_search_service import similar_to_product
+
+_log = logging.getLogger(__name__)
+
+PRODUCT_SQL = """
+    SELECT p.id, p.name, p.description, p.price_cents, p.category_id, c.name AS category, p.seller_id
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.id = %s
+"""
+
+REVIEWS_LIMIT = 10
+RELATED_LIMIT = 5
+
+# threads start on first use, not at import
+_executor = ThreadPoolExecutor(max_workers=PRODUCT_PAGE_WORKERS, thread_name_prefix="product-page")
+
+
+def product_code(product_id: int) -> str:
+    """15 -> 'P015', the id the document store and the view counters use."""
+    return f"P{product_id:03d}"
+
+
+def _mongo():
+    # imported on first use: the client connects (and fails fast) at import time
+    from src.db.mongodb_client import mongo_client
+
+    return mongo_client.db
+
+
+def _product(product_id: int) -> dict[str, Any] | None:
+    with db.get_cursor() as cur:
+        cur.execute(PRODUCT_SQL, (product_id,))
+        row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def _specs(product_id: int) -> dict[str, Any] | None:
+    return _mongo().product_specs.find_one({"product_id": product_code(product_id)}, {"_id": 0})
+
+
+def _reviews(product_id: int) -> list[dict[str, Any]]:
+    cursor = _mongo().reviews.find({"product_id": product_code(product_id)}, {"_id": 0})
+    return list(cursor.sort([("helpful_votes", -1)]).limit(REVIEWS_LIMIT))
+
+
+def _also_bought(product_id: int) -> list[dict[str, Any]]:
+    return recommendation_service.also_bought(product_id, limit=RELATED_LIMIT)
+
+
+def _similar(product_id: int) -> list[dict[str, Any]]:
+    return similar_to_product(product_id, limit=RELATED_LIMIT)
+
+
+SECTIONS: dict[str, Callable[[int], Any]] = {
+    "product": _product,
+    "specs": _specs,
+    "reviews": _reviews,
+    "also_bought": _also_bought,
+    "similar": _similar,
+}
+
+
+# one slot per queued or running load of each section
+_inflight = {section: threading.BoundedSemaphore(PRODUCT_PAGE_MAX_INFLIGHT) for section in SECTIONS}
+
+
+def _section_key(section: str, product_id: int) -> str:
+    return f"page:{section}:{product_id}"
+
+
+def _submit(section: str, product_id: int) -> Future | None:
+    """Queue a load of ``section``, or return None when it already has too many in flight."""
+    slots = _inflight[section]
+    if not slots.acquire(blocking=False):
+        return None
+    fut = _executor.submit(_load, section, product_id)
+    fut.add_done_callback(lambda _: slots.release())  # also runs when the load is cancelled
+    return fut
+
+
+def _load(section: str, product_id: int) -> Any:
+    value = SECTIONS[section](product_id)
+    if value is not None:  # "no such document" is not cached, so it shows up once written
+        redis_client.set_json(_section_key(section, product_id), value, ttl=PRODUCT_PAGE_TTLS[section])
+    return value
+
+
+def _log_failure(fut: Future) -> None:
+    if fut.exception() is not None:
+        _log.warning("product page: background call failed", exc_info=fut.exception())
+
+
+def get_product_page(product_id: int, timeouts: dict[str, float] | None = None) -> dict[str, Any] | None:
+    """
+    Product row, specs, top reviews, also-bought and similar products for one
+    page view, and a view recorded in the hot-products toplist.
+
+    Each section waits at most its timeout (``PRODUCT_PAGE_TIMEOUTS``, else
+    ``PRODUCT_PAGE_TIMEOUT``) counted from the start of the call; sections that
+    time out or fail are ``None`` and named in ``missing``. Returns None when
+    Postgres reports that the product does not exist.
+    """
+    timeouts = {**PRODUCT_PAGE_TIMEOUTS, **(timeouts or {})}
+    _executor.submit(redis_client.record_view, product_code(product_id)).add_done_callback(_log_failure)
+
+    keys = {section: _section_key(section, product_id) for section in SECTIONS}
+    cached = redis_client.get_many_json(keys.values())
+    page: dict[str, Any] = {section: cached[key] for section, key in keys.items() if key in cached}
+
+    start = time.monotonic()
+    futures = {s: _submit(s, product_id) for s in SECTIONS if s not in page}
+    missing = []
+    for section, fut in futures.items():
+        if fut is None:
+            _log.info("product page %s: %s section skipped, too many loads in flight", product_id, section)
+            page[section] = None
+            missing.append(section)
+            continue
+        deadline = start + timeouts.get(section, PRODUCT_PAGE_TIMEOUT)
+        try:
+            page[section] = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            _log.info("product page %s: %s section timed out", product_id, section)
+            if not fut.cancel():  # already running: let it land in the cache
+                fut.add_done_callback(_log_failure)
+            page[section] = None
+            missing.append(section)
+        except Exception:
+            _log.warning("product page %s: %s section failed", product_id, section, exc_info=True)
+            page[section] = None
+            missing.append(section)
+
+    if page["product"] is None and "product" not in missing:
+        return None
+    return {**{section: page[section] for section in SECTIONS}, "missing": missing}
+
+
+def invalidate_product_page(product_id: int, *sections: str) -> int:
+    """Drop cached sections of a product page (all of them by default); returns keys deleted."""
+    return redis_client.delete(*(_section_key(s, product_id) for s in sections or SECTIONS))
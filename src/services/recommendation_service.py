@@ -1,45 +1,302 @@
-"""High-level recommendation queries powered by Neo4j."""
+"""
+High-level recommendation queries powered by Neo4j.
 
+Results are cached in Redis per (method, id, limit). The graph only changes
+when purchases are written, so entries are tagged with the products they
+depend on and evicted by :meth:`RecommendationService.invalidate_purchases`
+rather than left to age out.
+"""
+
+import datetime
+import logging
+from collections.abc import Callable, Iterable, Mapping
 from typing import Any
 
+from neo4j import Query
+from neo4j.exceptions import ClientError, TransientError
+
+from src.config import (
+    PERSONALIZED_BUDGET,
+    PERSONALIZED_HALF_LIFE_DAYS,
+    PERSONALIZED_MAX_BUYERS,
+    PERSONALIZED_MAX_ITEMS,
+    PERSONALIZED_MAX_SEEDS,
+    RECO_CACHE_TTL,
+    RECO_FALLBACK_TTL,
+)
 from src.db.neo4j_client import neo4j_client
+from src.db.redis_client import redis_client
+
+_log = logging.getLogger(__name__)
+
+STATS = ("hits", "miss")
+KEY_PATTERN = "reco:*"  # every cached recommendation (stats and tag sets live under other prefixes)
+
+# precomputed neighbours (see src/loaders/copurchase_loader.py): one indexed
+# node lookup plus its CO_PURCHASED edges; k is null until the job has run
+CO_PURCHASED_CYPHER = """
+MATCH (p:Product {id:$pid})
+RETURN p.co_purchased_k AS k,
+       [(p)-[r:CO_PURCHASED]->(o:Product) | {id: o.id, name: o.name, weight: r.weight}] AS top
+"""
+
+# live traversals, used until a product's list is materialized
+ALSO_BOUGHT_CYPHER = """
+MATCH (p1:Product {id:$pid})<-[:PURCHASED]-(:User)-[:PURCHASED]->(p2:Product)
+WHERE p1 <> p2
+WITH p2, COUNT(*) AS freq
+RETURN p2.id AS id, p2.name AS name, freq
+ORDER BY freq DESC
+LIMIT $lim
+"""
+
+FREQUENTLY_BOUGHT_TOGETHER_CYPHER = """
+MATCH (p1:Product {id:$pid})<-[:PURCHASED]-(u:User)-[:PURCHASED]->(p:Product)
+WHERE p1 <> p
+WITH p, COUNT(*) AS together
+ORDER BY together DESC
+LIMIT $lim
+RETURN p.id AS id, p.name AS name, together
+"""
+
+PERSONALIZED_CYPHER = """
+MATCH (u:User {id:$uid})-[:PURCHASED]->(p1:Product)<-[:PURCHASED]-(o:User)-[:PURCHASED]->(p2:Product)
+WHERE NOT (u)-[:PURCHASED]->(p2)
+WITH p2, COUNT(*) AS score
+ORDER BY score DESC
+LIMIT $lim
+RETURN p2.id AS id, p2.name AS name, score
+"""
+
+# Bounded variant of PERSONALIZED_CYPHER. Every hop is capped: the user's
+# $max_seeds most recent products, the $max_buyers most recent other buyers of
+# each, and the $max_items most recent purchases of each buyer. Owned products
+# are filtered against the list collected up front instead of a NOT pattern
+# probe per candidate. A path scores quantity * 0.5^(age / half-life), so
+# fresh and bulk purchases count more.
+PERSONALIZED_BOUNDED_CYPHER = """
+MATCH (u:User {id:$uid})-[r:PURCHASED]->(p:Product)
+WITH u, p, max(r.date) AS last
+ORDER BY last DESC
+WITH u, collect(p) AS owned
+UNWIND owned[..$max_seeds] AS seed
+CALL {
+  WITH u, seed
+  MATCH (seed)<-[r1:PURCHASED]-(o:User)
+  WHERE o <> u
+  WITH o, max(r1.date) AS last
+  ORDER BY last DESC
+  LIMIT $max_buyers
+  RETURN o
+}
+CALL {
+  WITH o
+  MATCH (o)-[r2:PURCHASED]->(p2:Product)
+  RETURN p2, r2
+  ORDER BY r2.date DESC
+  LIMIT $max_items
+}
+WITH owned, p2, r2
+WHERE NOT p2 IN owned
+WITH p2, sum(
+  coalesce(r2.quantity, 1) * 0.5 ^ (duration.inDays(date(left(r2.date, 10)), date($today)).days / $half_life)
+) AS score
+ORDER BY score DESC, p2.id
+LIMIT $lim
+RETURN p2.id AS id, p2.name AS name, score
+"""
+
+# what personalized_bounded answers with when the budget runs out: the
+# precomputed neighbours of the user's most recent products
+PERSONALIZED_FALLBACK_CYPHER = """
+MATCH (u:User {id:$uid})-[r:PURCHASED]->(p:Product)
+WITH u, p, max(r.date) AS last
+ORDER BY last DESC
+WITH collect(p) AS owned
+UNWIND owned[..$max_seeds] AS seed
+MATCH (seed)-[c:CO_PURCHASED]->(p2:Product)
+WHERE NOT p2 IN owned
+WITH p2, sum(c.weight) AS score
+ORDER BY score DESC, p2.id
+LIMIT $lim
+RETURN p2.id AS id, p2.name AS name, score
+"""
+
+BOUGHT_BY_CYPHER = """
+UNWIND $uids AS uid
+MATCH (:User {id: uid})-[:PURCHASED]->(p:Product)
+RETURN DISTINCT p.id AS id
+"""
+
+
+def products_bought_by(user_ids: Iterable[int]) -> list[int]:
+    """Ids of every product any of ``user_ids`` has bought."""
+    with neo4j_client.driver.session() as s:
+        return [r["id"] for r in s.run(BOUGHT_BY_CYPHER, uids=sorted(set(user_ids)))]
+
+
+def bounded_request(
+    user_id: int, limit: int, max_seeds: int, max_buyers: int, max_items: int, half_life_days: float
+) -> tuple[str, dict[str, Any]]:
+    """Cache key and PERSONALIZED_BOUNDED_CYPHER parameters (except ``today``) for one call."""
+    key = f"reco:personalized_bounded:{user_id}:{limit}:{max_seeds}:{max_buyers}:{max_items}:{half_life_days:g}"
+    params = {
+        "uid": user_id,
+        "lim": limit,
+        "max_seeds": max_seeds,
+        "max_buyers": max_buyers,
+        "max_items": max_items,
+        "half_life": float(half_life_days),
+    }
+    return key, params
+
+
+def is_timeout(exc: ClientError | TransientError) -> bool:
+    """True when Neo4j aborted the transaction for running past its timeout."""
+    return "TimedOut" in (exc.code or "")
+
+
+def co_purchased_rows(record: Mapping[str, Any] | None, limit: int, field: str) -> list[dict[str, Any]] | None:
+    """
+    Top ``limit`` neighbours from a CO_PURCHASED_CYPHER record, with the
+    weight under ``field``; None when the materialized list cannot answer
+    (product unknown, not refreshed yet, or ``limit`` above its k).
+    """
+    if record is None or record["k"] is None or limit > record["k"]:
+        return None
+    top = sorted(record["top"], key=lambda n: (-n["weight"], n["id"]))[:limit]
+    return [{"id": n["id"], "name": n["name"], field: n["weight"]} for n in top]
 
 
 class RecommendationService:
     def also_bought(self, product_id: int, limit: int = 5) -> list[dict[str, Any]]:
-        query = """
-        MATCH (p1:Product {id:$pid})<-[:PURCHASED]-(:User)-[:PURCHASED]->(p2:Product)
-        WHERE p1 <> p2
-        WITH p2, COUNT(*) AS freq
-        RETURN p2.id AS id, p2.name AS name, freq
-        ORDER BY freq DESC
-        LIMIT $lim
-        """
-        with neo4j_client.driver.session() as s:
-            return [dict(r) for r in s.run(query, pid=product_id, lim=limit)]
+        return self._cached(
+            f"reco:also_bought:{product_id}:{limit}",
+            lambda: (self._co_purchased(ALSO_BOUGHT_CYPHER, product_id, limit, "freq"), [product_id], RECO_CACHE_TTL),
+        )
 
     def frequently_bought_together(self, product_id: int, limit: int = 5):
-        query = """
-        MATCH (:Product {id:$pid})<-[:PURCHASED]-(u:User)-[:PURCHASED]->(p:Product)
-        WITH p, COUNT(*) AS together
-        ORDER BY together DESC
-        LIMIT $lim
-        RETURN p.id AS id, p.name AS name, together
-        """
-        with neo4j_client.driver.session() as s:
-            return [dict(r) for r in s.run(query, pid=product_id, lim=limit)]
+        return self._cached(
+            f"reco:frequently_bought_together:{product_id}:{limit}",
+            lambda: (
+                self._co_purchased(FREQUENTLY_BOUGHT_TOGETHER_CYPHER, product_id, limit, "together"),
+                [product_id],
+                RECO_CACHE_TTL,
+            ),
+        )
 
     def personalized(self, user_id: int, limit: int = 5):
-        query = """
-        MATCH (u:User {id:$uid})-[:PURCHASED]->(p1:Product)<-[:PURCHASED]-(o:User)-[:PURCHASED]->(p2:Product)
-        WHERE NOT (u)-[:PURCHASED]->(p2)
-        WITH p2, COUNT(*) AS score
-        ORDER BY score DESC
-        LIMIT $lim
-        RETURN p2.id AS id, p2.name AS name, score
+        return self._cached(
+            f"reco:personalized:{user_id}:{limit}",
+            lambda: (self._personalized(user_id, limit), products_bought_by([user_id]), RECO_CACHE_TTL),
+            user_id=user_id,
+        )
+
+    def personalized_bounded(
+        self,
+        user_id: int,
+        limit: int = 5,
+        *,
+        max_seeds: int = PERSONALIZED_MAX_SEEDS,
+        max_buyers: int = PERSONALIZED_MAX_BUYERS,
+        max_items: int = PERSONALIZED_MAX_ITEMS,
+        half_life_days: float = PERSONALIZED_HALF_LIFE_DAYS,
+        budget: float = PERSONALIZED_BUDGET,
+    ):
+        """
+        :meth:`personalized` with a bounded fan-out, safe for heavy users and
+        bestsellers: at most ``max_seeds * max_buyers * max_items`` paths are
+        scored, recent and larger purchases weigh more. The query runs with a
+        ``budget``-second server-side timeout; when that expires the user's
+        precomputed CO_PURCHASED neighbours are returned instead, and cached
+        for ``RECO_FALLBACK_TTL`` only so the full result replaces them soon.
+        """
+        key, params = bounded_request(user_id, limit, max_seeds, max_buyers, max_items, half_life_days)
+
+        def compute() -> tuple[list[dict[str, Any]], list[int], int]:
+            rows, complete = self._personalized_bounded(params, budget)
+            return rows, products_bought_by([user_id]), RECO_CACHE_TTL if complete else RECO_FALLBACK_TTL
+
+        return self._cached(key, compute, user_id=user_id)
+
+    # ───────────────────────────── caching ──────────────────────────────
+    def invalidate_purchases(self, user_ids: Iterable[int], product_ids: Iterable[int] | None = None) -> int:
+        """
+        Evict every cached result that new PURCHASED edges from ``user_ids``
+        can change; call it after writing them. ``product_ids`` must be all
+        products those users have bought, new edges included (looked up when
+        None). Returns keys evicted.
+
+        A purchase u->q changes the co-purchase lists of q and of every
+        product u bought before, and the personalized lists of u and of
+        anyone who shares a product with u. Co-purchase entries are tagged
+        with their product and personalized ones with the buyer's products,
+        so the products u has bought cover all of these.
         """
+        user_ids = list(user_ids)
+        if product_ids is None:
+            product_ids = products_bought_by(user_ids)
+        tags = [*(f"reco:user:{u}" for u in user_ids), *(f"reco:product:{p}" for p in product_ids)]
+        return redis_client.invalidate_tags(*tags)
+
+    def invalidate_all(self) -> int:
+        """
+        Evict every cached recommendation (after a bulk graph load). Keys are
+        found by an incremental SCAN and unlinked in batches, so Redis is never
+        blocked however many there are.
+        """
+        return redis_client.delete_matching(KEY_PATTERN)
+
+    def cache_stats(self) -> dict[str, int]:
+        """Return hit / miss counters and the resulting hit rate."""
+        values = redis_client.client.mget([f"stats:reco:{name}" for name in STATS])
+        stats = {name: int(v or 0) for name, v in zip(STATS, values, strict=True)}
+        total = stats["hits"] + stats["miss"]
+        return {**stats, "hit_rate": stats["hits"] / total if total else 0.0}
+
+    def _cached(
+        self,
+        key: str,
+        compute: Callable[[], tuple[list[dict[str, Any]], Iterable[int], int]],
+        user_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """``compute`` returns the rows, the ids of the products they depend on and their TTL."""
+        rows = redis_client.get_json(key)
+        if rows is not None:
+            redis_client.client.incr("stats:reco:hits")
+            return rows
+        redis_client.client.incr("stats:reco:miss")
+        rows, product_ids, ttl = compute()
+        redis_client.set_json(key, rows, ttl=ttl)
+        tags = [f"reco:product:{p}" for p in product_ids]
+        if user_id is not None:
+            tags.append(f"reco:user:{user_id}")
+        redis_client.tag(key, tags, ttl)
+        return rows
+
+    # ────────────────────────────── queries ─────────────────────────────
+    def _personalized(self, user_id: int, limit: int) -> list[dict[str, Any]]:
+        with neo4j_client.driver.session() as s:
+            return [dict(r) for r in s.run(PERSONALIZED_CYPHER, uid=user_id, lim=limit)]
+
+    def _personalized_bounded(self, params: dict[str, Any], budget: float) -> tuple[list[dict[str, Any]], bool]:
+        """Rows and whether they are the full result (False: the co-purchase fallback)."""
+        query = Query(PERSONALIZED_BOUNDED_CYPHER, timeout=budget)
+        with neo4j_client.driver.session() as s:
+            try:
+                return [dict(r) for r in s.run(query, **params, today=datetime.date.today().isoformat())], True
+            except (ClientError, TransientError) as exc:
+                if not is_timeout(exc):
+                    raise
+                _log.warning("personalized for user %s exceeded %.2fs, using co-purchase lists", params["uid"], budget)
+                return [dict(r) for r in s.run(PERSONALIZED_FALLBACK_CYPHER, **params)], False
+
+    def _co_purchased(self, fallback: str, product_id: int, limit: int, field: str) -> list[dict[str, Any]]:
         with neo4j_client.driver.session() as s:
-            return [dict(r) for r in s.run(query, uid=user_id, lim=limit)]
+            rows = co_purchased_rows(s.run(CO_PURCHASED_CYPHER, pid=product_id).single(), limit, field)
+            if rows is None:
+                rows = [dict(r) for r in s.run(fallback, pid=product_id, lim=limit)]
+            return rows
 
 
 recommendation_service = RecommendationService()
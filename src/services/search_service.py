@@ -2,23 +2,88 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
 import logging
+import math
+import random
+import time
+from collections.abc import Callable, Iterable
 from typing import Any
 
-import psycopg2
 from psycopg2 import sql
-from psycopg2.extras import RealDictCursor
 
-from src.config import CACHE_TTL, POSTGRES_CONFIG
+from src.config import (
+    CACHE_TTL,
+    SEARCH_FACETS_TTL,
+    SEARCH_LOCK_TTL,
+    SEARCH_LOCK_WAIT,
+    SEARCH_PRICE_BUCKETS,
+    SEARCH_STALE_TTL,
+    SEARCH_XFETCH_BETA,
+)
+from src.db.postgres_client import PostgresPool, db
 from src.db.redis_client import redis_client
 
 _log = logging.getLogger(__name__)
 
+STATS = ("hits", "miss", "coalesced", "stale", "early_refresh")
+PRICE_RANGES_KEY = "search:price_ranges"  # every "lo-hi" filter with live cached results
+FACETS_PRICE_TAG = "search:facets:price"  # every cached facet set; evicted on any price change
+
+# Hits, the top-N page and facet counts in one pass over the tsquery match.
+# Facets are counted over the text match alone (ignoring the category/price
+# filters) so they depend only on the query and can be cached longer.
+FACETS_SQL = """
+WITH m AS (
+    SELECT id, name, price_cents, category_id,
+           ts_rank_cd(search_vector, plainto_tsquery(%(q)s)) AS rank,
+           width_bucket(price_cents, %(edges)s::int[]) AS bucket
+    FROM products
+    WHERE search_vector @@ plainto_tsquery(%(q)s)
+), hits AS (
+    SELECT * FROM m WHERE TRUE {filters}
+)
+SELECT
+    (SELECT count(*) FROM hits) AS total,
+    (SELECT coalesce(json_agg(t), '[]') FROM (
+        SELECT id, name, price_cents, rank FROM hits ORDER BY rank DESC LIMIT %(lim)s
+    ) t) AS items,
+    {facets} AS facets
+"""
+
+FACET_COUNTS_SQL = """
+(SELECT coalesce(json_agg(json_build_object(
+            'by', CASE WHEN f.by_category = 0 THEN 'category' ELSE 'price' END,
+            'key', CASE WHEN f.by_category = 0 THEN f.category_id ELSE f.bucket END,
+            'name', c.name,
+            'count', f.n)), '[]')
+ FROM (
+    SELECT GROUPING(category_id) AS by_category, category_id, bucket, count(*) AS n
+    FROM m
+    GROUP BY GROUPING SETS ((category_id), (bucket))
+ ) f
+ LEFT JOIN categories c ON f.by_category = 0 AND c.id = f.category_id)
+"""
+
+# never part of a token for the default text-search parser, so safe to trim off words
+_PUNCT = ',;:!?()[]{}"'
+
 
 class ProductSearchService:
-    def __init__(self) -> None:
-        self._conn = psycopg2.connect(**POSTGRES_CONFIG)
-        self._conn.autocommit = True
+    """
+    Safe to share between threads: each query borrows its own connection from
+    ``pool`` (the shared ``db.pool`` unless a dedicated one is passed), so the
+    number of concurrent Postgres queries is bounded by the pool's max size.
+    """
+
+    def __init__(self, pool: PostgresPool | None = None) -> None:
+        self._pool = pool
+
+    @property
+    def pool(self) -> PostgresPool:
+        return self._pool or db.pool
 
     # ─────────────────────────── public api ────────────────────────────
     def search(
@@ -32,36 +97,313 @@ class ProductSearchService:
         Full-text search across product name+description with optional
         category-id and price-cents range filters.
 
-        Caches each distinct parameter set for 1 h.
+        Caches each distinct parameter set for 1 h. Only the caller holding a
+        short Redis lock recomputes a missing or expired entry: the others
+        serve the stale copy, or wait briefly for the fresh one when there is
+        none. Entries are also refreshed early, with a probability that grows
+        as expiry nears and with how long the query took (XFetch).
+        """
+        cache_key = self._make_key(self.canonical_query(query), category, price_range, limit)
+        return self._cached(
+            cache_key, lambda: self._run_pg_query(query, category, price_range, limit), category, price_range
+        )
+
+    def search_page(
+        self,
+        query: str,
+        category: int | None = None,
+        price_range: tuple[int, int] | None = None,
+        page_size: int = 20,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        One page of :meth:`search` results ordered by (rank, id) descending.
+
+        Returns ``{"items": [...], "next_cursor": str | None}``; pass
+        ``next_cursor`` back to get the following page. Pages seek past the
+        last (rank, id) seen instead of using OFFSET, and each page is cached
+        on its own.
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        after_key = f"{after[0]!r}:{after[1]}" if after else "start"
+        cache_key = f"{self._make_key(self.canonical_query(query), category, price_range, page_size)}:after:{after_key}"
+        # one extra row tells whether another page exists
+        rows = self._cached(
+            cache_key,
+            lambda: self._run_pg_page(query, category, price_range, page_size + 1, after),
+            category,
+            price_range,
+        )
+        items = rows[:page_size]
+        next_cursor = self._encode_cursor(items[-1]) if len(rows) > page_size else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def search_with_facets(
+        self,
+        query: str,
+        category: int | None = None,
+        price_range: tuple[int, int] | None = None,
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        """
+        Top-N hits plus result counts per category and per price bucket.
+
+        Returns ``{"items", "total", "facets": {"category": [...], "price": [...]}}``.
+        ``total`` honours the filters; facet counts cover every product
+        matching the text so a UI can show how each filter would narrow it.
+        The page is cached like :meth:`search`; facets are cached per query
+        for ``SEARCH_FACETS_TTL``. Both come from a single SQL statement.
         """
-        cache_key = self._make_key(query, category, price_range, limit)
-        cached = redis_client.get_json(cache_key)
-        if cached is not None:
-            redis_client.client.incr("stats:search:hits")
-            return cached
+        canonical = self.canonical_query(query)
+        page_key = f"{self._make_key(canonical, category, price_range, limit)}:total"
+        facets_key = f"search:facets:{hashlib.sha1(canonical.encode()).hexdigest()}"
+        page, facets = redis_client.get_json(page_key), redis_client.get_json(facets_key)
+        if page is not None and facets is not None:
+            self._count("hits")
+            return {**page, "facets": facets}
 
-        redis_client.client.incr("stats:search:miss")
+        self._count("miss")
+        result = self._run_pg_facets(query, category, price_range, limit, with_facets=facets is None)
+        if page is None:
+            page = {"items": result["items"], "total": result["total"]}
+            redis_client.set_json(page_key, page, ttl=CACHE_TTL)
+            self._tag(page_key, page["items"], category, price_range)
+        if facets is None:
+            facets = result["facets"]
+            redis_client.set_json(facets_key, facets, ttl=SEARCH_FACETS_TTL)
+            # a product moving between categories or price buckets shifts these counts;
+            # the old price is unknown on update, so any price change evicts every facet set
+            tags = [FACETS_PRICE_TAG, *(f"search:category:{f['id']}" for f in facets["category"])]
+            redis_client.tag(facets_key, tags, SEARCH_FACETS_TTL)
+        return {**page, "facets": facets}
 
-        rows = self._run_pg_query(query, category, price_range, limit)
-        redis_client.set_json(cache_key, rows, ttl=CACHE_TTL)
-        return rows
+    @staticmethod
+    def canonical_query(query: str) -> str:
+        """
+        Cache-key form of a query: lower-cased, de-duplicated, sorted
+        whitespace-separated words with surrounding punctuation trimmed and
+        bare symbols dropped. ``plainto_tsquery`` parses each such word on its
+        own and ANDs the lexemes, so queries with the same canonical form
+        match the same rows: "Wooden Bowl", "wooden  bowl" and "bowl, wooden"
+        all become "bowl wooden". Words are never split, since the parser
+        reads "t-shirt" or "3.5" differently from their parts. SQL always gets
+        the query as typed.
+        """
+        words = (w.strip(_PUNCT) for w in query.lower().split())
+        return " ".join(sorted({w for w in words if any(c.isalnum() for c in w)}))  # "&" alone is no lexeme
+
+    def invalidate_product(
+        self,
+        product_id: int,
+        category_ids: Iterable[int] = (),
+        price_cents: int | None = None,
+    ) -> int:
+        """
+        Evict cached result sets a product change can affect: every set that
+        contains the product, those filtered on ``category_ids`` (pass the old
+        and new category on a move) and, when the price changed, those whose
+        price filter covers the new ``price_cents`` plus all cached facet
+        counts. Returns keys evicted.
+        """
+        tags = [f"search:product:{product_id}", *(f"search:category:{c}" for c in category_ids)]
+        if price_cents is not None:
+            tags.append(FACETS_PRICE_TAG)
+            for rng in redis_client.client.smembers(PRICE_RANGES_KEY):
+                lo, hi = map(int, rng.split("-"))
+                if lo <= price_cents <= hi:
+                    tags.append(f"search:price:{rng}")
+        return redis_client.invalidate_tags(*tags)
 
     def cache_stats(self) -> dict[str, int]:
-        """Return current hit / miss counters."""
-        h = redis_client.client.get("stats:search:hits") or 0
-        m = redis_client.client.get("stats:search:miss") or 0
-        return {"hits": int(h), "miss": int(m)}
+        """Return current hit / miss / coalesced / stale / early-refresh counters."""
+        values = redis_client.client.mget([f"stats:search:{name}" for name in STATS])
+        return {name: int(v or 0) for name, v in zip(STATS, values, strict=True)}
 
     # ──────────────────────── internal helpers ─────────────────────────
-    def _make_key(
+    def _cached(
+        self,
+        cache_key: str,
+        compute: Callable[[], list[dict[str, Any]]],
+        cat: int | None,
+        pr: tuple[int, int] | None,
+    ) -> list[dict[str, Any]]:
+        entry = self._unwrap(redis_client.get_json(cache_key))
+        now = time.time()
+
+        if entry is not None:
+            if not self._should_refresh(entry, now):
+                self._count("hits")
+                return entry["rows"]
+            token = redis_client.acquire_lock(cache_key, SEARCH_LOCK_TTL)
+            if token is None:  # someone else is refreshing
+                self._count("hits", "stale" if now >= entry["expires"] else None)
+                return entry["rows"]
+            self._count("early_refresh" if now < entry["expires"] else "miss")
+            return self._recompute(cache_key, token, compute, cat, pr)
+
+        token = redis_client.acquire_lock(cache_key, SEARCH_LOCK_TTL)
+        if token is None:
+            entry = self._wait_for(cache_key)
+            if entry is not None:
+                self._count("coalesced")
+                return entry["rows"]
+            _log.warning("search cache: gave up waiting for %s, querying directly", cache_key)
+        self._count("miss")
+        return self._recompute(cache_key, token, compute, cat, pr)
+
+    @staticmethod
+    def _count(*names: str | None) -> None:
+        with redis_client.client.pipeline(transaction=False) as pipe:
+            for name in filter(None, names):
+                pipe.incr(f"stats:search:{name}")
+            pipe.execute()
+
+    @staticmethod
+    def _unwrap(cached: Any) -> dict[str, Any] | None:
+        """Cached envelope, treating a bare row list (pre-envelope format) as fresh."""
+        if isinstance(cached, list):
+            return {"rows": cached, "delta": 0.0, "expires": math.inf}
+        return cached
+
+    @staticmethod
+    def _should_refresh(entry: dict[str, Any], now: float) -> bool:
+        # XFetch: now - delta * beta * ln(U) >= expiry, with U in (0, 1]
+        return now - entry["delta"] * SEARCH_XFETCH_BETA * math.log(1.0 - random.random()) >= entry["expires"]
+
+    @staticmethod
+    def _result_tags(rows: list[dict[str, Any]], cat: int | None, pr: tuple[int, int] | None) -> list[str]:
+        tags = [f"search:product:{r['id']}" for r in rows]
+        if cat:
+            tags.append(f"search:category:{cat}")
+        if pr:
+            tags.append(f"search:price:{pr[0]}-{pr[1]}")
+        return tags
+
+    def _tag(self, cache_key: str, rows: list[dict[str, Any]], cat: int | None, pr: tuple[int, int] | None) -> None:
+        ttl = CACHE_TTL + SEARCH_STALE_TTL
+        if pr:
+            with redis_client.client.pipeline(transaction=False) as pipe:
+                pipe.sadd(PRICE_RANGES_KEY, f"{pr[0]}-{pr[1]}")
+                pipe.expire(PRICE_RANGES_KEY, ttl)
+                pipe.execute()
+        redis_client.tag(cache_key, self._result_tags(rows, cat, pr), ttl)
+
+    def _wait_for(self, cache_key: str) -> dict[str, Any] | None:
+        deadline = time.monotonic() + SEARCH_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            entry = self._unwrap(redis_client.get_json(cache_key))
+            if entry is not None:
+                return entry
+        return None
+
+    def _recompute(
         self,
+        cache_key: str,
+        token: str | None,
+        compute: Callable[[], list[dict[str, Any]]],
+        cat: int | None,
+        pr: tuple[int, int] | None,
+    ) -> list[dict[str, Any]]:
+        try:
+            start = time.perf_counter()
+            rows = compute()
+            entry = {"rows": rows, "delta": time.perf_counter() - start, "expires": time.time() + CACHE_TTL}
+            # kept past its logical expiry so it can be served stale during the refresh
+            redis_client.set_json(cache_key, entry, ttl=CACHE_TTL + SEARCH_STALE_TTL)
+            self._tag(cache_key, rows, cat, pr)
+            return rows
+        finally:
+            if token is not None:
+                redis_client.release_lock(cache_key, token)
+
+    @staticmethod
+    def _make_key(
         q: str,
         cat: int | None,
         pr: tuple[int, int] | None,
         lim: int,
     ) -> str:
+        """Expects a :meth:`canonical_query`; hashed so key length is bounded."""
         pr_key = f"{pr[0]}-{pr[1]}" if pr else "all"
-        return f"search:{q}:{cat or 'all'}:{pr_key}:{lim}"
+        q_hash = hashlib.sha1(q.encode()).hexdigest()
+        return f"search:{q_hash}:{cat or 'all'}:{pr_key}:{lim}"
+
+    @staticmethod
+    def _encode_cursor(row: dict[str, Any]) -> str:
+        raw = json.dumps([row["rank"], row["id"]], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[float, int]:
+        try:
+            rank, pid = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return float(rank), int(pid)
+        except (ValueError, TypeError) as exc:
+            raise ValueError(f"invalid search cursor: {cursor!r}") from exc
+
+    @staticmethod
+    def _match_sql(q: str, cat: int | None, pr: tuple[int, int] | None) -> tuple[list[sql.Composable], list[Any]]:
+        parts = [
+            sql.SQL(
+                "SELECT id, name, price_cents, "
+                "ts_rank_cd(search_vector, plainto_tsquery(%s)) AS rank "
+                "FROM products "
+                "WHERE search_vector @@ plainto_tsquery(%s)"
+            )
+        ]
+        params: list[Any] = [q, q]
+
+        if cat:
+            parts.append(sql.SQL("AND category_id = %s"))
+            params.append(cat)
+        if pr:
+            parts.append(sql.SQL("AND price_cents BETWEEN %s AND %s"))
+            params.extend(pr)
+        return parts, params
+
+    def _run_pg_facets(
+        self,
+        q: str,
+        cat: int | None,
+        pr: tuple[int, int] | None,
+        lim: int,
+        with_facets: bool = True,
+    ) -> dict[str, Any]:
+        filters = []
+        params: dict[str, Any] = {"q": q, "edges": list(SEARCH_PRICE_BUCKETS), "lim": lim}
+        if cat:
+            filters.append(sql.SQL("AND category_id = %(cat)s"))
+            params["cat"] = cat
+        if pr:
+            filters.append(sql.SQL("AND price_cents BETWEEN %(lo)s AND %(hi)s"))
+            params["lo"], params["hi"] = pr
+        query = sql.SQL(FACETS_SQL).format(
+            filters=sql.SQL(" ").join(filters),
+            facets=sql.SQL(FACET_COUNTS_SQL if with_facets else "NULL::json"),
+        )
+        with self.pool.cursor() as cur:
+            cur.execute(query, params)
+            row = cur.fetchone()
+        result = {"items": row["items"], "total": row["total"], "facets": None}
+        if with_facets:
+            result["facets"] = self._shape_facets(row["facets"])
+        return result
+
+    @staticmethod
+    def _shape_facets(counts: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+        categories = sorted(
+            ({"id": f["key"], "name": f["name"], "count": f["count"]} for f in counts if f["by"] == "category"),
+            key=lambda f: -f["count"],
+        )
+        # width_bucket: 0 is below the first edge, len(edges) at or above the last
+        by_bucket = {f["key"]: f["count"] for f in counts if f["by"] == "price"}
+        edges = [None, *SEARCH_PRICE_BUCKETS, None]
+        price = [
+            {"min": edges[i], "max": edges[i + 1], "count": by_bucket.get(i, 0)}
+            for i in range(len(SEARCH_PRICE_BUCKETS) + 1)
+        ]
+        return {"category": categories, "price": price}
 
     def _run_pg_query(
         self,
@@ -70,29 +412,33 @@ class ProductSearchService:
         pr: tuple[int, int] | None,
         lim: int,
     ) -> list[dict[str, Any]]:
-        with self._conn.cursor(cursor_factory=RealDictCursor) as cur:
-            parts = [
-                sql.SQL(
-                    "SELECT id, name, price_cents, "
-                    "ts_rank_cd(search_vector, plainto_tsquery(%s)) AS rank "
-                    "FROM products "
-                    "WHERE search_vector @@ plainto_tsquery(%s)"
-                )
-            ]
-            params = [q, q]
-
-            if cat:
-                parts.append(sql.SQL("AND category_id = %s"))
-                params.append(cat)
-            if pr:
-                parts.append(sql.SQL("AND price_cents BETWEEN %s AND %s"))
-                params.extend(pr)
-
+        with self.pool.cursor() as cur:
+            parts, params = self._match_sql(q, cat, pr)
             parts.append(sql.SQL("ORDER BY rank DESC LIMIT %s"))
             params.append(lim)
 
             cur.execute(sql.SQL(" ").join(parts), params)
             return [dict(r) for r in cur.fetchall()]
 
+    def _run_pg_page(
+        self,
+        q: str,
+        cat: int | None,
+        pr: tuple[int, int] | None,
+        lim: int,
+        after: tuple[float, int] | None,
+    ) -> list[dict[str, Any]]:
+        parts, params = self._match_sql(q, cat, pr)
+        query = sql.SQL("SELECT * FROM ({}) m").format(sql.SQL(" ").join(parts))
+        if after:
+            # rank is real; compare at that precision so the row we stopped at is excluded exactly
+            query += sql.SQL(" WHERE (rank, id) < (%s::real, %s)")
+            params.extend(after)
+        query += sql.SQL(" ORDER BY rank DESC, id DESC LIMIT %s")
+        params.append(lim)
+        with self.pool.cursor() as cur:
+            cur.execute(query, params)
+            return [dict(r) for r in cur.fetchall()]
+
 
 search_service = ProductSearchService()
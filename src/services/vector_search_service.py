@@ -1,19 +1,146 @@
 """Semantic product-similarity search backed by pgvector (sync/psycopg2)."""
 
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from hashlib import sha1
 from typing import Any
 
-import psycopg2
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import redis
 
-from src.config import POSTGRES_CONFIG
+from src.config import EMBED_CACHE_REDIS, EMBED_CACHE_SIZE, EMBED_CACHE_TTL
+from src.db.postgres_client import db
+from src.db.redis_client import redis_client
+from src.utils.embedding_model import get_model
+from src.utils.embedding_model import warm_up as _warm_up_model
 
-MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-CONN = psycopg2.connect(**POSTGRES_CONFIG)
-CONN.autocommit = True
+_log = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache of query embeddings keyed by normalised query text.
+
+    Tier 1 is a bounded in-process LRU; tier 2 (optional) is Redis, holding
+    the vector as packed float32 bytes so every app process shares one copy.
+    Hit / miss counters are per process.
+    """
+
+    def __init__(
+        self,
+        max_size: int = EMBED_CACHE_SIZE,
+        ttl: int = EMBED_CACHE_TTL,
+        use_redis: bool = EMBED_CACHE_REDIS,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._local: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "miss": 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _redis_key(norm: str) -> str:
+        return f"emb:q:{sha1(norm.encode('utf8')).hexdigest()}"
+
+    def get(self, query: str) -> np.ndarray:
+        return self.get_many([query])[query]
+
+    def get_many(self, queries: Sequence[str]) -> dict[str, np.ndarray]:
+        """
+        Embeddings for every query, keyed by the query as given. Local misses
+        are fetched from Redis with one MGET, and whatever is still missing is
+        encoded in a single model call.
+        """
+        norms = {q: self.normalize(q) for q in queries}
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for norm in dict.fromkeys(norms.values()):
+                vec = self._local.get(norm)
+                if vec is not None:
+                    self._local.move_to_end(norm)
+                    self._stats["local_hits"] += 1
+                    found[norm] = vec
+
+        pending = [n for n in dict.fromkeys(norms.values()) if n not in found]
+        from_redis = self._redis_get_many(pending)
+        to_encode = [n for n in pending if n not in from_redis]
+        encoded: dict[str, np.ndarray] = {}
+        if to_encode:
+            vecs = get_model().encode(to_encode, normalize_embeddings=True).astype(np.float32)
+            encoded = dict(zip(to_encode, vecs, strict=True))
+            self._redis_set_many(encoded)
+
+        with self._lock:
+            self._stats["redis_hits"] += len(from_redis)
+            self._stats["miss"] += len(encoded)
+            for norm, vec in (from_redis | encoded).items():
+                self._local[norm] = vec
+                self._local.move_to_end(norm)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+        found |= from_redis | encoded
+        return {q: found[n] for q, n in norms.items()}
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self._stats["local_hits"] + self._stats["redis_hits"], **self._stats}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def _redis_get_many(self, norms: list[str]) -> dict[str, np.ndarray]:
+        if not self.use_redis or not norms:
+            return {}
+        try:
+            raws = redis_client.raw.mget([self._redis_key(n) for n in norms])
+        except redis.RedisError:
+            _log.warning("embedding cache: redis get failed", exc_info=True)
+            return {}
+        return {n: np.frombuffer(raw, dtype=np.float32) for n, raw in zip(norms, raws, strict=True) if raw}
+
+    def _redis_set_many(self, vecs: dict[str, np.ndarray]) -> None:
+        if not self.use_redis:
+            return
+        try:
+            with redis_client.raw.pipeline(transaction=False) as pipe:
+                for norm, vec in vecs.items():
+                    pipe.setex(self._redis_key(norm), self.ttl, vec.tobytes())
+                pipe.execute()
+        except redis.RedisError:
+            _log.warning("embedding cache: redis set failed", exc_info=True)
+
+
+query_cache = QueryEmbeddingCache()
+
+
+def warm_up() -> None:
+    """
+    Load the embedding model and open a pooled Postgres connection ahead of
+    traffic. Nothing happens at import time; without this call both are
+    initialised by the first request.
+    """
+    _warm_up_model()
+    with db.get_cursor() as cur:
+        cur.execute("SELECT 1")
+
+
+def cache_stats() -> dict[str, int]:
+    """Query-embedding cache hit / miss counters for this process."""
+    return query_cache.stats()
 
 
 def similar_by_text(query: str, limit: int = 5) -> list[dict[str, Any]]:
-    vec = MODEL.encode(query, normalize_embeddings=True).tolist()
+    vec = query_cache.get(query).tolist()
     sql = """
         SELECT p.id,
                p.name,
@@ -24,10 +151,10 @@ def similar_by_text(query: str, limit: int = 5) -> list[dict[str, Any]]:
         ORDER BY e.embedding <#> %s::vector
         LIMIT %s
     """
-    with CONN.cursor() as cur:
+    with db.get_cursor() as cur:
         cur.execute(sql, (vec, vec, limit))
         rows = cur.fetchall()
-    return [{"id": r[0], "name": r[1], "price_cents": r[2], "score": r[3]} for r in rows]
+    return [dict(r) for r in rows]
 
 
 def similar_to_product(product_id: int, limit: int = 5) -> list[dict[str, Any]]:
@@ -48,7 +175,79 @@ def similar_to_product(product_id: int, limit: int = 5) -> list[dict[str, Any]]:
         ORDER BY e.embedding <#> src.embedding
         LIMIT %s
     """
-    with CONN.cursor() as cur:
+    with db.get_cursor() as cur:
         cur.execute(sql, (product_id, product_id, limit))
         rows = cur.fetchall()
-    return [{"id": r[0], "name": r[1], "price_cents": r[2], "score": r[3]} for r in rows]
+    return [dict(r) for r in rows]
+
+
+# ───────────────────────────── batch api ─────────────────────────────
+def _neighbour(r: dict[str, Any]) -> dict[str, Any]:
+    return {"id": r["id"], "name": r["name"], "price_cents": r["price_cents"], "score": r["score"]}
+
+
+def similar_by_text_many(queries: Sequence[str], limit: int = 5) -> dict[str, list[dict[str, Any]]]:
+    """
+    :func:`similar_by_text` for many queries: one model call for the
+    uncached embeddings and one SQL statement (LATERAL top-k per vector).
+    Results are keyed by the query strings as given.
+    """
+    if not queries:
+        return {}
+    vecs = query_cache.get_many(queries)
+    distinct = list(dict.fromkeys(queries))
+    sql = """
+        SELECT q.ord, n.id, n.name, n.price_cents, n.score
+        FROM unnest(%s::text[]) WITH ORDINALITY AS q(vec, ord)
+        CROSS JOIN LATERAL (
+            SELECT p.id,
+                   p.name,
+                   p.price_cents,
+                   1 - (e.embedding <#> q.vec::vector) AS score
+            FROM product_embeddings e
+            JOIN products p ON p.id = e.product_id
+            ORDER BY e.embedding <#> q.vec::vector
+            LIMIT %s
+        ) n
+        ORDER BY q.ord, n.score DESC
+    """
+    with db.get_cursor() as cur:
+        cur.execute(sql, ([str(vecs[q].tolist()) for q in distinct], limit))
+        rows = cur.fetchall()
+    out: dict[str, list[dict[str, Any]]] = {q: [] for q in distinct}
+    for r in rows:
+        out[distinct[r["ord"] - 1]].append(_neighbour(r))
+    return out
+
+
+def similar_to_products_many(product_ids: Sequence[int], limit: int = 5) -> dict[int, list[dict[str, Any]]]:
+    """
+    :func:`similar_to_product` for many products in one SQL statement.
+    Products without an embedding map to an empty list.
+    """
+    if not product_ids:
+        return {}
+    sql = """
+        SELECT s.product_id AS src_id, n.id, n.name, n.price_cents, n.score
+        FROM product_embeddings s
+        CROSS JOIN LATERAL (
+            SELECT p.id,
+                   p.name,
+                   p.price_cents,
+                   1 - (e.embedding <#> s.embedding) AS score
+            FROM product_embeddings e
+            JOIN products p ON p.id = e.product_id
+            WHERE e.product_id <> s.product_id
+            ORDER BY e.embedding <#> s.embedding
+            LIMIT %s
+        ) n
+        WHERE s.product_id = ANY(%s)
+        ORDER BY s.product_id, n.score DESC
+    """
+    with db.get_cursor() as cur:
+        cur.execute(sql, (limit, list(product_ids)))
+        rows = cur.fetchall()
+    out: dict[int, list[dict[str, Any]]] = {pid: [] for pid in product_ids}
+    for r in rows:
+        out[r["src_id"]].append(_neighbour(r))
+    return out
@@ -1,34 +1,101 @@
 """Utilities for parsing CSV data."""
 
+from collections.abc import Iterator, Sequence
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 
 RAW_DIR = Path(__file__).resolve().parents[2] / "raw_data" / "relational_data"
 
+CHUNK_ROWS = 50_000  # rows per DataFrame chunk; bounds peak memory of every streaming reader
+
+# Explicit dtypes for the numeric columns so pandas doesn't have to infer them
+# (and widen to int64/object) chunk by chunk. Text columns stay object.
+DTYPES: dict[str, dict[str, str]] = {
+    "categories": {"id": "int32"},
+    "sellers": {"rating": "float64"},
+    "products": {"price": "float64", "stock": "int32"},
+    "order_items": {"quantity": "int16", "price": "float64"},
+}
+
+
+def _dtypes(name: str, columns: Sequence[str] | None) -> dict[str, str]:
+    return {c: t for c, t in DTYPES.get(name, {}).items() if columns is None or c in columns}
+
+
+def iter_csv(
+    name: str,
+    columns: Sequence[str] | None = None,
+    chunksize: int = CHUNK_ROWS,
+    directory: Path = RAW_DIR,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream ``<directory>/<name>.csv`` as DataFrames of at most ``chunksize`` rows.
+
+    ``columns`` projects the file down to the given columns before parsing,
+    so unused wide columns (e.g. embeddings) never reach memory.
+    """
+    with pd.read_csv(
+        directory / f"{name}.csv",
+        usecols=list(columns) if columns is not None else None,
+        dtype=_dtypes(name, columns),
+        chunksize=chunksize,
+    ) as reader:
+        yield from reader
+
+
+def iter_records(
+    name: str,
+    columns: Sequence[str] | None = None,
+    chunksize: int = CHUNK_ROWS,
+    directory: Path = RAW_DIR,
+) -> Iterator[list[dict[str, Any]]]:
+    """Like :func:`iter_csv` but yields each chunk as a list of row dicts."""
+    for chunk in iter_csv(name, columns, chunksize, directory):
+        yield chunk.to_dict("records")
+
 
 class DataParser:
-    @staticmethod
-    def _read(name: str) -> pd.DataFrame:
-        return pd.read_csv(RAW_DIR / f"{name}.csv")
+    """
+    Per-table readers built on :func:`iter_csv`: every ``parse_*`` method
+    yields DataFrames of at most ``chunksize`` rows instead of loading the
+    whole file, so callers should loop over the chunks (or concatenate them
+    when a file is known to be small).
+    """
+
+    def __init__(self, chunksize: int = CHUNK_ROWS, directory: Path = RAW_DIR) -> None:
+        self.chunksize = chunksize
+        self.directory = directory
+
+    def _read(self, name: str, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return iter_csv(name, columns, self.chunksize, self.directory)
+
+    def stream(self, name: str, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        """Chunks of any table ``name`` in this parser's directory."""
+        return self._read(name, columns)
+
+    def records(self, name: str, columns: Sequence[str] | None = None) -> Iterator[list[dict[str, Any]]]:
+        """Chunks of ``name`` as lists of row dicts, via :func:`iter_records`."""
+        return iter_records(name, columns, self.chunksize, self.directory)
 
-    def parse_categories(self) -> pd.DataFrame:
-        return self._read("categories")
+    def parse_categories(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("categories", columns)
 
-    def parse_users(self) -> pd.DataFrame:
-        return self._read("users")
+    def parse_users(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("users", columns)
 
-    def parse_sellers(self) -> pd.DataFrame:
-        return self._read("sellers")
+    def parse_sellers(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("sellers", columns)
 
-    def parse_products(self) -> pd.DataFrame:
-        return self._read("products")
+    def parse_products(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("products", columns)
 
-    def parse_orders(self) -> pd.DataFrame:
-        return self._read("orders")
+    def parse_orders(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("orders", columns)
 
-    def parse_order_items(self) -> pd.DataFrame:
-        return self._read("order_items")
+    def parse_order_items(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("order_items", columns)
 
-    def parse_product_embeddings(self) -> pd.DataFrame:
-        return self._read("product_embeddings")
+    def parse_product_embeddings(self, columns: Sequence[str] | None = None) -> Iterator[pd.DataFrame]:
+        return self._read("product_embeddings", columns)
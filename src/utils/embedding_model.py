@@ -0,0 +1,35 @@
+"""Lazily loaded sentence-embedding model shared by loaders and services."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+_model: SentenceTransformer | None = None
+_lock = threading.Lock()
+
+
+def get_model() -> SentenceTransformer:
+    """Return the shared model, importing and loading it on first call (thread-safe)."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
+
+
+def is_loaded() -> bool:
+    return _model is not None
+
+
+def warm_up() -> None:
+    """Load the model and run one encode so the first real request doesn't pay for it."""
+    get_model().encode("warm up", normalize_embeddings=True)
@@ -13,6 +13,8 @@ from neo4j import GraphDatabase
 from pymongo import MongoClient
 
 from src.config import MONGO_CONFIG, NEO4J_CONFIG, POSTGRES_CONFIG
+from src.loaders import copurchase_loader
+from src.services.recommendation_service import recommendation_service
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
 rng = random.Random(42)
@@ -134,6 +136,11 @@ def main(total: int = 100) -> None:
     logging.info("upserting %s PURCHASED edges into Neo4j", len(neo_tx))
     _insert_neo(neo_tx)
 
+    buyers = {uid for uid, *_ in neo_tx}
+    touched = copurchase_loader.refresh_for_buyers(buyers)
+    evicted = recommendation_service.invalidate_purchases(buyers, touched)
+    logging.info("refreshed co-purchase lists of %s products, evicted %s cached recommendations", len(touched), evicted)
+
     logging.info("purchase generation complete")
 
 
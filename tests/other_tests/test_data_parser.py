@@ -0,0 +1,37 @@
+"""Streaming CSV reader: chunk bounds, projection and typed columns."""
+
+import pandas as pd
+
+from src.utils.data_parser import RAW_DIR, DataParser, iter_csv, iter_records
+
+
+def test_iter_csv_chunks_match_full_read():
+    full = pd.read_csv(RAW_DIR / "order_items.csv")
+    chunks = list(iter_csv("order_items", chunksize=25))
+
+    assert all(len(c) <= 25 for c in chunks)
+    assert sum(len(c) for c in chunks) == len(full)
+    assert str(chunks[0]["quantity"].dtype) == "int16"
+
+
+def test_iter_records_projects_columns():
+    batch = next(iter_records("product_embeddings", ["product_id"], chunksize=10))
+    assert len(batch) == 10
+    assert set(batch[0]) == {"product_id"}
+
+
+def test_data_parser_streams_chunks():
+    parser = DataParser(chunksize=25)
+    chunks = list(parser.parse_order_items())
+
+    assert all(len(c) <= 25 for c in chunks)
+    assert pd.concat(chunks, ignore_index=True).equals(
+        pd.read_csv(RAW_DIR / "order_items.csv", dtype={"quantity": "int16"})
+    )
+    assert set(next(parser.records("products", ["id", "price"]))[0]) == {"id", "price"}
+
+
+def test_data_parser_stream_uses_its_settings(tmp_path):
+    pd.DataFrame({"id": range(7)}).to_csv(tmp_path / "things.csv", index=False)
+    chunks = list(DataParser(chunksize=3, directory=tmp_path).stream("things"))
+    assert [len(c) for c in chunks] == [3, 3, 1]
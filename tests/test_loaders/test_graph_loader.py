@@ -1,5 +1,10 @@
+import pandas as pd
+
+from src.config import CO_PURCHASE_TOP_K
 from src.db.neo4j_client import neo4j_client
 from src.loaders.graph_loader import main as load_graph
+from src.loaders.graph_loader import purchase_edges
+from src.services.recommendation_service import ALSO_BOUGHT_CYPHER, recommendation_service
 
 
 def test_graph_loaded():
@@ -15,3 +20,34 @@ def test_graph_loaded():
     assert p_cnt > 0, "no products"
     assert c_cnt > 0, "no categories"
     assert r_cnt > 0, "no PURCHASED relationships"
+
+
+def test_co_purchased_matches_live_traversal():
+    load_graph()  # also materializes CO_PURCHASED
+
+    with neo4j_client.driver.session() as s:
+        pid = s.run("MATCH (p:Product)-[:CO_PURCHASED]->() RETURN p.id AS id LIMIT 1").single()["id"]
+        live = [r["freq"] for r in s.run(ALSO_BOUGHT_CYPHER, pid=pid, lim=CO_PURCHASE_TOP_K)]
+
+    stored = recommendation_service.also_bought(pid, limit=CO_PURCHASE_TOP_K)
+    assert [r["freq"] for r in stored] == live  # ids may differ only among ties at the cut-off
+
+
+def test_purchase_edges_aggregates_quantity():
+    orders = pd.DataFrame(
+        {"id": ["O0001", "O0002"], "user_id": ["U001", "U002"], "created_at": ["2025-01-01", "2025-01-02"]}
+    )
+    items = pd.DataFrame(
+        {
+            "order_id": ["O0001", "O0001", "O0002", "O9999"],
+            "product_id": ["P010", "P010", "P011", "P012"],
+            "quantity": [1, 2, 3, 1],
+        }
+    )
+
+    edges = purchase_edges(orders, items).sort_values("pid").to_dict("records")
+
+    assert edges == [
+        {"uid": 1, "pid": 10, "date": "2025-01-01", "quantity": 3},
+        {"uid": 2, "pid": 11, "date": "2025-01-02", "quantity": 3},
+    ]
@@ -1,6 +1,11 @@
 import json
 
+import pandas as pd
+import pytest
+
 from src.db.postgres_client import db
+from src.loaders import relational_loader
+from src.loaders.relational_loader import RelationalLoader
 
 
 def test_order_items_fk_integrity():
@@ -24,3 +29,30 @@ def test_embeddings_shape():
         row = cur.fetchone()
     vec = json.loads(row["embedding"])
     assert len(vec) == 384
+
+
+def test_copy_mode_is_idempotent():
+    loader = RelationalLoader(copy_tables=["orders", "order_items"])
+    loader.load_orders()
+    loader.load_order_items()
+    with db.get_cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS c FROM order_items")
+        before = cur.fetchone()["c"]
+
+    loader.load_order_items()  # staged rows all conflict → nothing new
+    with db.get_cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS c FROM order_items")
+        assert cur.fetchone()["c"] == before
+
+    report = loader.report["load_order_items"]
+    assert report["rows"] > 0 and report["rows_per_sec"] > 0
+
+
+def test_products_with_unknown_seller_fail_fast(tmp_path, monkeypatch):
+    products = pd.read_csv(relational_loader.DATA_DIR / "products.csv", nrows=2)
+    products.loc[1, "seller_id"] = "S99999"
+    products.to_csv(tmp_path / "products.csv", index=False)
+    monkeypatch.setattr(relational_loader, "DATA_DIR", tmp_path)
+
+    with pytest.raises(KeyError, match="S99999"):
+        RelationalLoader().load_products()
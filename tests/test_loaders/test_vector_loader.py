@@ -13,3 +13,11 @@ def test_vector_loader_insert():
 
     # we generated 60 mock products earlier, so expect ≥ 60 vectors
     assert row_count >= 60
+
+
+def test_vector_loader_incremental_skips_unchanged():
+    load_vectors(incremental=False)
+
+    stats = load_vectors()  # nothing changed since the full run
+    assert stats["encoded"] == 0
+    assert stats["skipped"] >= 60
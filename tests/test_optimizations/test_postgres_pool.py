@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from src.db.postgres_client import PoolTimeout, PostgresPool, db
+
+
+def test_get_cursor_reuses_connection():
+    with db.get_cursor() as cur:
+        cur.execute("SELECT pg_backend_pid() AS pid")
+        pid1 = cur.fetchone()["pid"]
+    with db.get_cursor() as cur:
+        cur.execute("SELECT pg_backend_pid() AS pid")
+        pid2 = cur.fetchone()["pid"]
+    assert pid1 == pid2
+
+
+def test_pool_stats_and_timeout():
+    pool = PostgresPool(min_size=0, max_size=1, timeout=0.2)
+    conn = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    pool.putconn(conn)
+
+    with pool.cursor() as cur:
+        cur.execute("SELECT 1 AS ok")
+        assert cur.fetchone()["ok"] == 1
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["created"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["size"] == 1 and stats["in_use"] == 0
+    pool.close()
+
+
+def test_pool_waiter_gets_released_connection():
+    pool = PostgresPool(min_size=0, max_size=1, timeout=5)
+    conn = pool.getconn()
+    got = []
+
+    t = threading.Thread(target=lambda: got.append(pool.getconn()))
+    t.start()
+    time.sleep(0.1)  # let the thread block on the empty pool
+    pool.putconn(conn)
+    t.join(timeout=5)
+
+    assert got == [conn]
+    assert pool.stats()["waits"] == 1
+    pool.putconn(got[0])
+    pool.close()
+
+
+def test_pool_reaps_idle_above_min():
+    pool = PostgresPool(min_size=0, max_size=2, idle_timeout=0)
+    pool.putconn(pool.getconn())
+    with pool.cursor():
+        pass
+    assert pool.stats()["reaped"] >= 1
+    pool.close()
@@ -1,7 +1,10 @@
+import json
 import time
+from decimal import Decimal
 
 from src.config import CART_TTL, RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
-from src.db.redis_client import redis_client
+from src.db.near_cache import NearCache
+from src.db.redis_client import RedisClient, redis_client
 
 
 def test_cart_add():
@@ -47,3 +50,115 @@ def test_hot_products_sorted():
     top = redis_client.get_hot_products(top=3)
     pids = [pid for pid, score in top]
     assert pids == ["P2", "P3", "P1"]
+
+
+def test_cart_bulk_ops():
+    redis_client.add_many_to_cart("U1", {"P1": 2, "P2": 1})
+    redis_client.add_many_to_cart("U1", {"P1": 1})
+    redis_client.update_cart("U2", "P3", 5)
+    redis_client.update_cart("U2", "P4", 1)
+    redis_client.update_cart("U2", "P4", 0)  # removes the line
+
+    carts = redis_client.get_carts(["U1", "U2", "U3"])
+    assert carts == {"U1": {"P1": 3, "P2": 1}, "U2": {"P3": 5}, "U3": {}}
+    assert 0 < redis_client.client.ttl("cart:U1") <= CART_TTL
+
+
+def test_rate_limit_algorithms():
+    for algorithm in ("fixed_window", "sliding_log", "sliding_counter", "token_bucket"):
+        endpoint = f"t-{algorithm}"
+        redis_client.set_rate_limit_policy(endpoint, algorithm, limit=3, window=10)
+
+        results = [redis_client.rate_limit("U1", endpoint) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False], algorithm
+        assert [r.remaining for r in results[:3]] == [2, 1, 0], algorithm
+        assert results[0].retry_after == 0
+        assert 0 < results[3].retry_after <= 20, algorithm
+
+
+def test_rate_limit_zero_limit_blocks_with_finite_retry():
+    for algorithm in ("fixed_window", "sliding_log", "sliding_counter", "token_bucket"):
+        endpoint = f"t0-{algorithm}"
+        redis_client.set_rate_limit_policy(endpoint, algorithm, limit=0, window=10)
+
+        for _ in range(2):
+            result = redis_client.rate_limit("U1", endpoint)
+            assert not result.allowed and result.remaining == 0, algorithm
+            assert 0 < result.retry_after <= 10, algorithm
+
+
+def test_near_cache_coherence():
+    app1, app2 = RedisClient(near_cache_size=16), RedisClient(near_cache_size=16)  # two "processes"
+    app1.set_json("search:demo", ["P1"], ttl=60)
+
+    assert app1.get_json("search:demo") == ["P1"]  # remote hit, now cached locally
+    assert app1.get_json("search:demo") == ["P1"]  # local hit
+    app2.set_json("search:demo", ["P2"], ttl=60)  # publishes an invalidation
+    time.sleep(0.2)
+
+    assert app1.get_json("search:demo") == ["P2"]
+    stats = app1.near_cache_stats()
+    assert stats["local_hits"] == 1 and stats["remote_hits"] == 2 and stats["invalidations"] == 1
+    app1.near.close()
+    app2.near.close()
+
+
+def test_near_cache_discards_only_invalidated_fetches():
+    near = NearCache(redis_client.client, max_size=4, max_ttl=60)
+    clock = near.clock  # read before the (simulated) Redis fetches
+    near.drop("search:other")  # unrelated invalidation mid-fetch
+    near.put("search:a", 1, 10, clock)
+    near.drop("search:b")
+    near.put("search:b", 2, 10, clock)  # may be stale: not kept
+    assert near.get("search:a") == (True, 1)
+    assert near.get("search:b") == (False, None)
+
+    clock = near.clock
+    near.drop(*(f"search:x{i}" for i in range(5)))  # more keys than remembered
+    near.put("search:c", 3, 10, clock)
+    assert near.get("search:c") == (False, None)  # unknown, so assumed invalidated
+    near.close()
+
+
+def test_cache_codecs_per_prefix():
+    client = RedisClient(codecs={"search:": "orjson+zlib", "search:big:": "msgpack+lz4"})
+    rows = [{"id": i, "name": f"Mug {i}", "price_cents": 1500 + i, "rank": Decimal("0.25")} for i in range(200)]
+
+    assert client.codec_for("search:big:x") is not client.codec_for("search:x") is not client.codec
+    for key in ("search:big:x", "search:x", "other:x"):
+        client.set_json(key, rows, ttl=60)
+        assert client.get_json(key) == [{**r, "rank": 0.25} for r in rows], key
+    assert len(client.raw.get("search:x")) < len(json.dumps(rows, default=float))  # compressed
+
+    client.client.setex("legacy:x", 60, json.dumps({"a": 1}))  # written before codecs existed
+    assert client.get_json("legacy:x") == {"a": 1}
+
+
+def test_tag_ttl_never_shrinks():
+    redis_client.tag("search:facets:t1", ["ttl-demo"], ttl=6 * 3600)
+    redis_client.tag("search:t2", ["ttl-demo"], ttl=3600)  # shorter-lived entry, same tag
+    assert redis_client.client.ttl("tag:ttl-demo") > 3600
+
+    redis_client.tag("search:facets:t3", ["ttl-demo"], ttl=12 * 3600)
+    assert redis_client.client.ttl("tag:ttl-demo") > 6 * 3600
+    assert redis_client.invalidate_tags("ttl-demo") == 0  # tagged keys were never written
+
+
+def test_unreadable_codec_values_are_misses():
+    client = RedisClient(near_cache_size=0)
+    client.raw.setex("search:from-newer-build", 60, bytes((0, 9, 0)) + b"\x01")  # serializer this build lacks
+    client.raw.setex("search:lz-missing", 60, bytes((0, 1, 7)) + b"{}")  # compression this build lacks
+    client.set_json("search:ok", [1], ttl=60)
+
+    assert client.get_json("search:from-newer-build") is None
+    assert client.get_many_json(["search:from-newer-build", "search:lz-missing", "search:ok"]) == {"search:ok": [1]}
+
+
+def test_delete_matching_unlinks_in_batches():
+    for i in range(25):
+        redis_client.client.set(f"dm:{i}", i)
+    redis_client.client.set("dm-keep", 1)
+
+    assert redis_client.delete_matching("dm:*", batch=10) == 25
+    assert redis_client.client.keys("dm*") == ["dm-keep"]
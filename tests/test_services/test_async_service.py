@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from src.db.async_redis_client import AsyncRedisClient
+from src.db.redis_client import RedisClient, redis_client
+from src.services.async_service import AsyncMarketService
+from src.services.search_service import search_service
+
+
+@pytest.mark.asyncio
+async def test_async_search_shares_cache_and_coalesces_misses():
+    redis_client.client.flushdb()
+    async with AsyncMarketService() as market:
+        results = await asyncio.gather(*(market.search("Product", limit=5) for _ in range(20)))
+
+    assert all(r == results[0] for r in results)
+    assert search_service.cache_stats()["miss"] == 1
+    assert search_service.cache_stats()["coalesced"] == 19
+    assert search_service.search("product", limit=5) == results[0]  # served from the entry the async path wrote
+    assert search_service.cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_orders_match_sync_semantics():
+    async with AsyncMarketService() as market:
+        oid = await market.create_order(1, [{"product_id": 1, "qty": 1}, {"product_id": 1, "qty": 2}])
+        pool = await market.pg()
+        row = await pool.fetchrow("SELECT quantity FROM order_items WHERE order_id = $1", oid)
+        assert row["quantity"] == 3
+
+        with pytest.raises(ValueError, match="unknown product ids"):
+            await market.create_orders([{"user_id": 1, "items": [{"product_id": 999999, "qty": 1}]}])
+        assert await pool.fetchval("SELECT count(*) FROM orders WHERE id > $1", oid) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_redis_matches_sync_client():
+    async with AsyncMarketService() as market:
+        await market.redis.add_many_to_cart("U7", {"P1": 2})
+        await market.redis.add_to_cart("U7", "P1")
+        assert await market.redis.get_cart("U7") == redis_client.get_cart("U7") == {"P1": 3}
+
+        redis_client.set_rate_limit_policy("async-test", "token_bucket", limit=2, window=10)
+        allowed = [(await market.redis.rate_limit("U7", "async-test")).allowed for _ in range(3)]
+        assert allowed == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_async_search_honours_the_cross_process_lock():
+    redis_client.client.flushdb()
+    key = search_service._make_key("product", None, None, 5)
+    stale = {"rows": [{"id": -1}], "delta": 0.01, "expires": time.time() - 1}
+    redis_client.set_json(key, stale, ttl=60)
+
+    async with AsyncMarketService() as market:
+        token = redis_client.acquire_lock(key, 5)  # another process is recomputing
+        assert await market.search("product", limit=5) == stale["rows"]
+        assert search_service.cache_stats()["stale"] == 1
+
+        redis_client.release_lock(key, token)
+        fresh = await market.search("product", limit=5)
+    assert fresh != stale["rows"] and redis_client.get_json(key)["rows"] == fresh
+    assert redis_client.client.exists(f"lock:{key}") == 0
+
+
+@pytest.mark.asyncio
+async def test_async_writes_invalidate_near_caches(monkeypatch):
+    reader, writer = RedisClient(near_cache_size=16), RedisClient(near_cache_size=16)  # two "processes"
+    monkeypatch.setattr(writer.near, "_conn", None)  # the blocking connection must stay unused
+    async_writer = AsyncRedisClient(sync=writer)
+
+    reader.set_json("search:async-demo", ["P1"], ttl=60)
+    assert reader.get_json("search:async-demo") == reader.get_json("search:async-demo") == ["P1"]
+    await async_writer.set_json("search:async-demo", ["P2"], ttl=60)
+    await asyncio.sleep(0.2)
+    assert reader.get_json("search:async-demo") == ["P2"]
+
+    await async_writer.aclose()
+    reader.near.close()
+
+
+@pytest.mark.asyncio
+async def test_async_orders_invalidate_cached_recommendations(monkeypatch):
+    async with AsyncMarketService() as market:
+
+        async def cypher(_query, **_params):
+            return [{"id": 2}]  # user 1 bought product 2 earlier
+
+        monkeypatch.setattr(market, "_cypher", cypher)
+        for key, tag in (("reco:a:1", "reco:user:1"), ("reco:b:2", "reco:product:2"), ("reco:c:3", "reco:product:3")):
+            redis_client.set_json(key, [], ttl=60)
+            redis_client.tag(key, [tag], 60)
+
+        await market.create_order(1, [{"product_id": 1, "qty": 1}])
+        assert redis_client.client.exists("reco:a:1", "reco:b:2", "reco:c:3") == 1  # only product 3 is unrelated
+
+        await market.redis.add_to_cart("U8", "P1")
+        assert await market.redis.get_carts(["U8", "U9"]) == redis_client.get_carts(["U8", "U9"])
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from src.services import hybrid_search_service
+from src.services.hybrid_search_service import hybrid_search, rrf_fuse
+
+
+def _hits(*ids):
+    return [{"id": i, "name": f"P{i}", "price_cents": 100 * i, "score": 1 / n} for n, i in enumerate(ids, start=1)]
+
+
+def test_rrf_fuse_weights_and_sources():
+    ranked = {"lexical": _hits(1, 2, 3), "semantic": _hits(3, 4)}
+
+    fused = rrf_fuse(ranked, k=60)
+    assert [h["id"] for h in fused] == [3, 1, 2, 4]  # 3 is found by both legs
+    assert fused[0]["sources"] == {"lexical": {"rank": 3, "score": 1 / 3}, "semantic": {"rank": 1, "score": 1.0}}
+    assert fused[0]["score"] == pytest.approx(1 / 63 + 1 / 61)
+
+    semantic_only = rrf_fuse(ranked, weights={"lexical": 0.0}, k=60)
+    assert [h["id"] for h in semantic_only][:2] == [3, 4]
+
+
+def test_hybrid_runs_legs_concurrently_and_survives_a_failed_leg(monkeypatch):
+    def slow(ids):
+        def leg(_query, limit):
+            time.sleep(0.3)
+            return _hits(*ids)[:limit]
+
+        return leg
+
+    monkeypatch.setattr(hybrid_search_service, "LEGS", {"lexical": slow([1, 2]), "semantic": slow([2, 5])})
+    start = time.perf_counter()
+    result = hybrid_search("bowl", limit=2)
+    assert time.perf_counter() - start < 0.5
+    assert [h["id"] for h in result] == [2, 1]
+
+    def broken(*_):
+        raise RuntimeError("vector store down")
+
+    monkeypatch.setattr(hybrid_search_service, "LEGS", {"lexical": slow([1, 2]), "semantic": broken})
+    assert [h["id"] for h in hybrid_search("bowl")] == [1, 2]
+
+    monkeypatch.setattr(hybrid_search_service, "LEGS", {"semantic": broken})
+    with pytest.raises(RuntimeError, match="vector store down"):
+        hybrid_search("bowl")
@@ -0,0 +1,45 @@
+import pytest
+
+from src.db.postgres_client import db
+from src.services.order_service import create_order, create_orders
+
+
+def _items(order_id):
+    with db.get_cursor() as cur:
+        cur.execute(
+            "SELECT oi.product_id, oi.quantity, oi.price_cents = p.price_cents AS price_ok "
+            "FROM order_items oi JOIN products p ON p.id = oi.product_id WHERE oi.order_id = %s ORDER BY 1",
+            (order_id,),
+        )
+        return [tuple(r.values()) for r in cur.fetchall()]
+
+
+def test_create_order_prices_and_merges_lines():
+    oid = create_order(1, [{"product_id": 2, "qty": 1}, {"product_id": 1, "qty": 2}, {"product_id": 2, "qty": 3}])
+    assert _items(oid) == [(1, 2, True), (2, 4, True)]
+
+
+def test_create_orders_batch_is_atomic():
+    oids = create_orders(
+        [
+            {"user_id": 1, "items": [{"product_id": 1, "qty": 1}]},
+            {"user_id": 2, "items": [{"product_id": 3, "qty": 2}, {"product_id": 4, "qty": 1}]},
+        ]
+    )
+    assert len(set(oids)) == 2
+    assert _items(oids[0]) == [(1, 1, True)]
+    assert _items(oids[1]) == [(3, 2, True), (4, 1, True)]
+
+    with db.get_cursor() as cur:
+        cur.execute("SELECT count(*) AS n FROM orders")
+        before = cur.fetchone()["n"]
+    with pytest.raises(ValueError, match=r"unknown product ids: \[999999\]"):
+        create_orders(
+            [
+                {"user_id": 1, "items": [{"product_id": 1, "qty": 1}]},
+                {"user_id": 2, "items": [{"product_id": 999999, "qty": 1}]},
+            ]
+        )
+    with db.get_cursor() as cur:
+        cur.execute("SELECT count(*) AS n FROM orders")
+        assert cur.fetchone()["n"] == before
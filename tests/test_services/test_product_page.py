@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services import product_page_service
+from src.services.product_page_service import get_product_page, invalidate_product_page
+
+
+def _leg(value, delay=0.0, calls=None):
+    def leg(product_id):
+        if calls is not None:
+            calls.append(product_id)
+        time.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return leg
+
+
+def _stub_sections(monkeypatch, **overrides):
+    sections = {
+        "product": _leg({"id": 7, "name": "Bowl", "price_cents": 1500}),
+        "specs": _leg({"product_id": "P007", "specs": {"material": "Wood"}}),
+        "reviews": _leg([{"rating": 5, "title": "Great"}]),
+        "also_bought": _leg([{"id": 8, "name": "Spoon", "freq": 3}]),
+        "similar": _leg([{"id": 9, "name": "Plate", "price_cents": 900, "score": 0.9}]),
+        **overrides,
+    }
+    monkeypatch.setattr(product_page_service, "SECTIONS", sections)
+
+
+def test_sections_run_concurrently_and_are_cached(monkeypatch):
+    calls = []
+    _stub_sections(monkeypatch, product=_leg({"id": 7, "name": "Bowl", "price_cents": 1500}, 0.2, calls))
+    monkeypatch.setitem(product_page_service.SECTIONS, "similar", _leg([], 0.2))
+
+    start = time.perf_counter()
+    page = get_product_page(7, timeouts={"product": 1, "similar": 1})
+    assert time.perf_counter() - start < 0.35  # the two slow legs overlap
+    assert page["product"]["name"] == "Bowl"
+    assert page["specs"]["specs"] == {"material": "Wood"}
+    assert page["missing"] == []
+
+    assert get_product_page(7) == page
+    assert calls == [7]  # second view came from the section cache
+
+    invalidate_product_page(7, "product")
+    get_product_page(7, timeouts={"product": 1})
+    assert calls == [7, 7]
+
+
+def test_slow_and_failing_sections_give_a_partial_page(monkeypatch):
+    _stub_sections(
+        monkeypatch,
+        similar=_leg([{"id": 9, "name": "Plate", "price_cents": 900, "score": 0.9}], delay=0.3),
+        also_bought=_leg(RuntimeError("graph down")),
+    )
+
+    start = time.perf_counter()
+    page = get_product_page(8, timeouts={"similar": 0.05})
+    assert time.perf_counter() - start < 0.25
+    assert page["similar"] is None and page["also_bought"] is None
+    assert sorted(page["missing"]) == ["also_bought", "similar"]
+    assert page["product"]["name"] == "Bowl"
+
+    time.sleep(0.4)  # the late section caches itself once it lands
+    assert get_product_page(8, timeouts={"similar": 0.05})["similar"][0]["id"] == 9
+
+
+def test_unknown_product_returns_none(monkeypatch):
+    _stub_sections(monkeypatch, product=_leg(None), specs=_leg(None))
+    assert get_product_page(404) is None
+
+
+def test_timed_out_sections_are_cancelled_and_bounded(monkeypatch):
+    calls = []
+    sections = {
+        "similar": _leg([], 0.3, calls),
+        "product": _leg({"id": 9}, 0.0, calls),
+        "reviews": _leg([], 0.0, calls),
+    }
+    monkeypatch.setattr(product_page_service, "SECTIONS", sections)
+    # one worker: the fast sections are still queued behind "similar" when their deadline passes
+    monkeypatch.setattr(product_page_service, "_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setitem(product_page_service._inflight, "similar", threading.BoundedSemaphore(1))
+    timeouts = dict.fromkeys(sections, 0.05)
+
+    assert get_product_page(9, timeouts)["missing"] == ["similar", "product", "reviews"]
+    assert get_product_page(9, timeouts)["missing"] == ["similar", "product", "reviews"]
+    time.sleep(0.4)
+    assert calls == [9]  # queued loads were cancelled and the second "similar" never submitted
+    assert product_page_service._inflight["similar"].acquire(blocking=False)  # its slot came back
@@ -0,0 +1,89 @@
+from src.config import (
+    PERSONALIZED_HALF_LIFE_DAYS,
+    PERSONALIZED_MAX_BUYERS,
+    PERSONALIZED_MAX_ITEMS,
+    PERSONALIZED_MAX_SEEDS,
+    RECO_CACHE_TTL,
+    RECO_FALLBACK_TTL,
+)
+from src.db.redis_client import redis_client
+from src.services import recommendation_service as reco_module
+from src.services.recommendation_service import RecommendationService
+
+CAPS = (PERSONALIZED_MAX_SEEDS, PERSONALIZED_MAX_BUYERS, PERSONALIZED_MAX_ITEMS, PERSONALIZED_HALF_LIFE_DAYS)
+
+
+def _stub_graph(monkeypatch, owned):
+    calls = []
+
+    def co_purchased(_self, _fallback, product_id, limit, field):
+        calls.append(("co", product_id))
+        return [{"id": product_id + 1, "name": "x", field: 2}][:limit]
+
+    def personalized(_self, user_id, _limit):
+        calls.append(("pers", user_id))
+        return [{"id": 99, "name": "y", "score": 1}]
+
+    monkeypatch.setattr(RecommendationService, "_co_purchased", co_purchased)
+    monkeypatch.setattr(RecommendationService, "_personalized", personalized)
+    monkeypatch.setattr(reco_module, "products_bought_by", lambda uids: sorted({p for u in uids for p in owned[u]}))
+    return calls
+
+
+def test_results_are_cached_per_method_id_and_limit(monkeypatch):
+    calls = _stub_graph(monkeypatch, {})
+    svc = RecommendationService()
+    before = svc.cache_stats()
+
+    assert svc.also_bought(10, limit=3) == svc.also_bought(10, limit=3)
+    svc.frequently_bought_together(10, limit=3)
+    svc.also_bought(10, limit=4)
+
+    assert calls == [("co", 10)] * 3
+    stats = svc.cache_stats()
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["miss"] - before["miss"] == 3
+    assert 0 < stats["hit_rate"] < 1
+
+
+def test_purchases_evict_only_affected_results(monkeypatch):
+    # user 1 owns 10, user 2 owns 10 and 20, user 3 owns 30
+    owned = {1: [10], 2: [10, 20], 3: [30]}
+    calls = _stub_graph(monkeypatch, owned)
+    svc = RecommendationService()
+    for pid in (10, 20, 30, 40):
+        svc.also_bought(pid)
+    for uid in (1, 2, 3):
+        svc.personalized(uid)
+    calls.clear()
+
+    # user 1 buys product 40: lists of 10 and 40 change, and so does
+    # personalized for user 1 and for user 2, who shares product 10
+    owned[1].append(40)
+    assert svc.invalidate_purchases([1]) > 0
+    for pid in (10, 20, 30, 40):
+        svc.also_bought(pid)
+    for uid in (1, 2, 3):
+        svc.personalized(uid)
+    assert sorted(calls) == [("co", 10), ("co", 40), ("pers", 1), ("pers", 2)]
+
+    calls.clear()
+    assert svc.invalidate_all() >= 4
+    assert not redis_client.client.keys("reco:*")
+    svc.also_bought(30)
+    assert calls == [("co", 30)]
+
+
+def test_fallback_results_are_cached_briefly(monkeypatch):
+    _stub_graph(monkeypatch, {5: [], 6: []})
+    complete = {5: True, 6: False}  # user 6's traversal timed out
+    monkeypatch.setattr(
+        RecommendationService, "_personalized_bounded", lambda _self, params, _budget: ([], complete[params["uid"]])
+    )
+    svc = RecommendationService()
+    svc.personalized_bounded(5, budget=0.1)
+    svc.personalized_bounded(6, budget=0.1)
+
+    ttls = {uid: redis_client.client.ttl(reco_module.bounded_request(uid, 5, *CAPS)[0]) for uid in (5, 6)}
+    assert RECO_FALLBACK_TTL < ttls[5] <= RECO_CACHE_TTL
+    assert 0 < ttls[6] <= RECO_FALLBACK_TTL
@@ -1,5 +1,5 @@
 from src.loaders.graph_loader import main as load_graph
-from src.services.recommendation_service import recommendation_service
+from src.services.recommendation_service import co_purchased_rows, products_bought_by, recommendation_service
 
 
 def _seed_graph():
@@ -32,3 +32,31 @@ def test_personalized_service():
     assert isinstance(recs, list)
     if recs:
         assert {"id", "name", "score"} <= recs[0].keys()
+
+
+def test_personalized_bounded_service():
+    _seed_graph()
+    recs = recommendation_service.personalized_bounded(user_id=1, limit=3, max_seeds=5, max_buyers=5, max_items=5)
+    assert isinstance(recs, list) and len(recs) <= 3
+    if recs:
+        assert {"id", "name", "score"} <= recs[0].keys()
+        assert not {r["id"] for r in recs} & set(products_bought_by([1]))
+        assert [r["score"] for r in recs] == sorted((r["score"] for r in recs), reverse=True)
+
+
+def test_co_purchased_rows_falls_back_when_not_materialized():
+    top = [
+        {"id": 3, "name": "C", "weight": 2},
+        {"id": 2, "name": "B", "weight": 5},
+        {"id": 1, "name": "A", "weight": 2},
+    ]
+    record = {"k": 3, "top": top}
+
+    assert co_purchased_rows(record, 2, "freq") == [
+        {"id": 2, "name": "B", "freq": 5},
+        {"id": 1, "name": "A", "freq": 2},
+    ]
+    assert co_purchased_rows({"k": 3, "top": []}, 2, "freq") == []  # materialized, no co-purchases
+    assert co_purchased_rows(record, 4, "freq") is None  # deeper than the stored top-k
+    assert co_purchased_rows({"k": None, "top": []}, 2, "freq") is None
+    assert co_purchased_rows(None, 2, "freq") is None
@@ -0,0 +1,121 @@
+import pytest
+
+from src.db.postgres_client import db
+from src.db.redis_client import redis_client
+from src.services.search_service import ProductSearchService
+
+
+def fake_rows(*ids):
+    return lambda *_: [{"id": i, "name": f"Bowl {i}", "price_cents": 1000 * i, "rank": 0.1} for i in ids]
+
+
+def test_equivalent_queries_share_a_key():
+    service = ProductSearchService()
+    keys = {
+        service._make_key(service.canonical_query(q), None, None, 5)
+        for q in ("Wooden Bowl", "wooden  bowl", "bowl, wooden bowl")
+    }
+    assert len(keys) == 1
+    assert len(keys.pop()) < 80
+    assert service.canonical_query("Oak & Walnut_board") == "oak walnut_board"
+    assert service.canonical_query("T-Shirt 3.5") != service.canonical_query("shirt t 3 5")
+
+
+@pytest.mark.parametrize(
+    "variants",
+    [
+        ("Wooden Bowl", "bowl, wooden", "(wooden) bowl bowl"),
+        ("T-Shirt", "t-shirt"),
+        ("3.5 mm", "MM 3.5"),
+        ("Oak & Walnut_board", "walnut_board  oak"),
+    ],
+)
+def test_canonical_query_keeps_the_tsquery(variants):
+    # queries sharing a cache key must match the same rows, whatever text reaches plainto_tsquery
+    service = ProductSearchService()
+    assert len({service.canonical_query(q) for q in variants}) == 1
+    with db.get_cursor() as cur:
+        lexemes = set()
+        for q in (*variants, service.canonical_query(variants[0])):
+            cur.execute("SELECT plainto_tsquery(%s)::text AS q", (q,))
+            lexemes.add(frozenset(cur.fetchone()["q"].split(" & ")))
+    assert len(lexemes) == 1
+
+
+def test_product_update_evicts_only_affected_results():
+    redis_client.client.flushdb()
+    service = ProductSearchService()
+    service._run_pg_query = fake_rows(1, 2)
+    service.search("bowl", limit=5)  # contains products 1 and 2
+    service.search("bowl", category=7, limit=5)
+    service.search("bowl", price_range=(500, 1500), limit=5)
+    service._run_pg_query = fake_rows(3)
+    service.search("mug", limit=5)  # contains only product 3
+
+    def cached(q, cat=None, pr=None):
+        return redis_client.get_json(service._make_key(q, cat, pr, 5)) is not None
+
+    assert service.invalidate_product(3) == 1
+    assert not cached("mug") and cached("bowl") and cached("bowl", 7)
+
+    assert service.invalidate_product(9, category_ids=[7]) == 1  # moved into category 7
+    assert not cached("bowl", 7) and cached("bowl")
+
+    assert service.invalidate_product(9, price_cents=20_000) == 0  # outside every cached price filter
+    assert service.invalidate_product(9, price_cents=900) == 1
+    assert not cached("bowl", pr=(500, 1500)) and cached("bowl")
+
+
+def test_keyset_pages_cover_all_results_once():
+    service = ProductSearchService()
+    expected = service._run_pg_query("product", None, None, 10_000)
+
+    seen, cursor = [], None
+    while True:
+        page = service.search_page("product", page_size=7, cursor=cursor)
+        assert len(page["items"]) <= 7
+        seen.extend(r["id"] for r in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == len(expected)
+    assert set(seen) == {r["id"] for r in expected}
+    assert service.search_page("product", page_size=7)["items"] == service.search_page("product", page_size=7)["items"]
+
+
+def test_bad_cursor_rejected():
+    service = ProductSearchService()
+    with pytest.raises(ValueError, match="invalid search cursor"):
+        service.search_page("bowl", cursor="not-a-cursor")
+    assert service._decode_cursor(service._encode_cursor({"rank": 0.25, "id": 42})) == (0.25, 42)
+
+
+def test_facets_match_filtered_searches():
+    redis_client.client.flushdb()
+    service = ProductSearchService()
+    result = service.search_with_facets("product", limit=5)
+
+    assert len(result["items"]) == 5
+    assert result["total"] == sum(f["count"] for f in result["facets"]["category"])
+    assert result["total"] == sum(b["count"] for b in result["facets"]["price"])
+    for facet in result["facets"]["category"]:
+        assert facet["count"] == len(service._run_pg_query("product", facet["id"], None, 1000))
+
+    filtered = service.search_with_facets("product", category=result["facets"]["category"][0]["id"], limit=5)
+    assert filtered["total"] == result["facets"]["category"][0]["count"]
+    assert filtered["facets"] == result["facets"]  # facets ignore the filters and come from cache
+    assert service.search_with_facets("product", limit=5) == result
+
+
+def test_price_change_evicts_cached_facets():
+    redis_client.client.flushdb()
+    service = ProductSearchService()
+    result = service.search_with_facets("product", limit=5)
+    facets_keys = redis_client.client.keys("search:facets:[0-9a-f]*")
+    assert len(facets_keys) == 1
+
+    service.invalidate_product(result["items"][0]["id"])  # no price change: facets stay
+    assert redis_client.client.exists(*facets_keys) == 1
+    service.invalidate_product(result["items"][0]["id"], price_cents=result["items"][0]["price_cents"] + 1)
+    assert redis_client.client.exists(*facets_keys) == 0
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.db.postgres_client import PostgresPool
+from src.db.redis_client import redis_client
+from src.services.search_service import ProductSearchService
+
+
+def test_concurrent_search_bounded_pool():
+    pool = PostgresPool(min_size=0, max_size=3)
+    service = ProductSearchService(pool=pool)
+    limits = range(1, 49)  # one cache key per call, so every search goes to Postgres
+    redis_client.delete(*(service._make_key(service.canonical_query("lovely handmade"), None, None, n) for n in limits))
+
+    with ThreadPoolExecutor(max_workers=12) as ex:
+        results = list(ex.map(lambda n: service.search("lovely handmade", limit=n), limits))
+
+    stats = pool.stats()
+    assert stats["created"] <= 3
+    assert stats["checkouts"] == 48
+    assert stats["timeouts"] == 0
+    assert stats["in_use"] == 0 and stats["idle"] == stats["size"]  # every connection came back
+    for n, rows in zip(limits, results, strict=True):
+        assert rows == service._run_pg_query("lovely handmade", None, None, n)
+    pool.close()
+
+
+def test_cold_key_is_computed_once():
+    service = ProductSearchService()
+    key = service._make_key("stampede", None, None, 5)
+    redis_client.delete(key)
+    calls = []
+
+    def slow_query(*args):
+        calls.append(args)
+        time.sleep(0.3)
+        return [{"id": 1, "name": "Stampede Mug", "price_cents": 1200, "rank": 0.5}]
+
+    service._run_pg_query = slow_query
+    before = service.cache_stats()
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        results = list(ex.map(lambda _: service.search("stampede", limit=5), range(16)))
+
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results)
+    after = service.cache_stats()
+    assert after["miss"] - before["miss"] == 1
+    assert after["coalesced"] - before["coalesced"] == 15
+
+
+def test_expired_entry_served_stale_while_refreshing():
+    service = ProductSearchService()
+    key = service._make_key("stale", None, None, 5)
+    old = [{"id": 1, "name": "Old", "price_cents": 100, "rank": 0.1}]
+    new = [{"id": 2, "name": "New", "price_cents": 100, "rank": 0.1}]
+    redis_client.set_json(key, {"rows": old, "delta": 0.0, "expires": time.time() - 1}, ttl=60)
+    token = redis_client.acquire_lock(key, 5)  # another caller is already refreshing
+
+    assert service.search("stale", limit=5) == old
+    redis_client.release_lock(key, token)
+
+    service._run_pg_query = lambda *_: new
+    assert service.search("stale", limit=5) == new
+    assert service.search("stale", limit=5) == new
@@ -1,7 +1,15 @@
+import subprocess
+import sys
+
+import numpy as np
+
 from src.loaders.vector_loader import main as load_vectors
 from src.services.vector_search_service import (
+    QueryEmbeddingCache,
     similar_by_text,
+    similar_by_text_many,
     similar_to_product,
+    similar_to_products_many,
 )
 
 
@@ -25,3 +33,38 @@ def test_vector_similar_to_product():
     if res:
         # first hit must not be the same product
         assert res[0]["id"] != 1
+
+
+def test_import_does_not_load_model_or_connect():
+    probe = (
+        "import sys, src.services.vector_search_service\n"
+        "from src.db.postgres_client import db\n"
+        "assert 'sentence_transformers' not in sys.modules\n"
+        "assert db._pool is None\n"
+    )
+    subprocess.run([sys.executable, "-c", probe], check=True)
+
+
+def test_query_embedding_cache_tiers():
+    cache = QueryEmbeddingCache(max_size=8)
+
+    v1 = cache.get("Handmade  Wooden Bowl")  # miss → encoded, written to Redis
+    v2 = cache.get("handmade wooden bowl")  # same normalised key → local hit
+    cache.clear()
+    v3 = cache.get("handmade wooden bowl")  # local tier empty → Redis hit
+
+    assert cache.stats() == {"hits": 1, "local_hits": 0, "redis_hits": 1, "miss": 0}
+    assert v1.dtype == np.float32 and len(v1) == 384
+    assert np.array_equal(v1, v2) and np.array_equal(v1, v3)
+
+
+def test_batch_apis_match_single_calls():
+    _ensure_vectors()
+    by_id = similar_to_products_many([1, 2], limit=3)
+    assert set(by_id) == {1, 2}
+    assert [r["id"] for r in by_id[1]] == [r["id"] for r in similar_to_product(1, limit=3)]
+
+    by_text = similar_by_text_many(["handmade wooden bowl", "vintage gift"], limit=3)
+    assert [r["id"] for r in by_text["handmade wooden bowl"]] == [
+        r["id"] for r in similar_by_text("handmade wooden bowl", limit=3)
+    ]